@@ -6,27 +6,35 @@ MagicWound Card Game - Pygame GUI Version
 """
 
 import sys
-import os
-import base64
 import zlib
 import random
 import pygame
 import socket
+import selectors
+import struct
 import threading
-import queue
-from typing import List, Dict, Optional, Tuple, Callable
+from typing import List, Dict, Optional, Tuple, Callable, Set
 from enum import IntEnum
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import Counter, deque
+from itertools import chain, islice
+from functools import lru_cache, cached_property
 from pathlib import Path
 
+try:
+    # 可选：SIMD 加速的 base64 实现，接口与标准库一致
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 # 初始化 Pygame
 pygame.init()
 pygame.font.init()
 
 # 中文字体设置
+@lru_cache(maxsize=32)
 def get_chinese_font(size):
-    """获取中文字体"""
+    """获取中文字体（按字号缓存，各组件共用同一个字体对象）"""
     font_names = [
         'SimHei',  # 黑体
         'Microsoft YaHei',  # 微软雅黑
@@ -54,8 +62,12 @@ def get_chinese_font(size):
 # 屏幕设置
 SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 720
+SCREEN_AREA = SCREEN_WIDTH * SCREEN_HEIGHT
 FPS = 60
 
+# 各场景用到的字号，游戏启动时统一预加载
+FONT_SIZES = (16, 18, 20, 24, 32, 48, 72)
+
 # 颜色定义
 COLOR_BG = (20, 20, 40)
 COLOR_CARD_BG = (40, 40, 60)
@@ -68,6 +80,13 @@ COLOR_HP_BAR = (220, 50, 50)
 COLOR_MANA_BAR = (50, 150, 220)
 COLOR_ENERGY_BAR = (150, 220, 50)
 
+# 联机消息格式：4 字节大端长度前缀 + UTF-8 消息体
+NET_HEADER = struct.Struct('>I')
+NET_MAX_MESSAGE = 64 * 1024  # 超过该长度视为数据错误，断开连接
+
+# 按钮/卡牌/角色组件只响应这两类事件，其余事件无需遍历组件
+WIDGET_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN)
+
 # 元素颜色
 ELEMENT_COLORS = {
     1: (200, 200, 200),  # PHYSICAL - 灰
@@ -145,51 +164,202 @@ class GameState(IntEnum):
 
 # ============= 辅助函数 =============
 
+ELEMENT_NAMES = {
+    Element.PHYSICAL: "物理", Element.LIGHT: "光", Element.DARK: "暗",
+    Element.WATER: "水", Element.FIRE: "火", Element.EARTH: "土", Element.WIND: "风"
+}
+
+RARITY_NAMES = {
+    Rarity.COMMON: "普通", Rarity.UNCOMMON: "罕见", Rarity.RARE: "稀有",
+    Rarity.MYTHIC: "神话", Rarity.FUNNY: "趣味"
+}
+
 def element_to_string(element: Element) -> str:
     """元素转字符串"""
-    mapping = {
-        Element.PHYSICAL: "物理", Element.LIGHT: "光", Element.DARK: "暗",
-        Element.WATER: "水", Element.FIRE: "火", Element.EARTH: "土", Element.WIND: "风"
-    }
-    return mapping.get(element, "未知")
+    return ELEMENT_NAMES.get(element, "未知")
 
 def rarity_to_string(rarity: Rarity) -> str:
     """稀有度转字符串"""
-    mapping = {
-        Rarity.COMMON: "普通", Rarity.UNCOMMON: "罕见", Rarity.RARE: "稀有",
-        Rarity.MYTHIC: "神话", Rarity.FUNNY: "趣味"
-    }
-    return mapping.get(rarity, "未知")
+    return RARITY_NAMES.get(rarity, "未知")
+
+def is_printable_input(text: str) -> bool:
+    """键盘输入的字符是否可显示（单个 ASCII 字符直接比较，其余再查 Unicode 类别）"""
+    if len(text) == 1 and ' ' <= text < '\x7f':
+        return True
+    return text.isprintable()
+
+def element_mask(elements: List[Element]) -> int:
+    """元素列表转位掩码（第 n 位表示元素值 n），判断是否含某元素只需一次按位与"""
+    mask = 0
+    for e in elements:
+        mask |= 1 << e
+    return mask
 
 def card_type_to_string(card_type: CardType) -> str:
     """卡牌类型转字符串"""
     return "生物" if card_type == CardType.CREATURE else "法术"
 
-def generate_checksum(data: str) -> str:
-    """生成CRC32校验和"""
-    crc = zlib.crc32(data.encode('utf-8')) & 0xffffffff
-    return f"{crc:08x}"[:4]
+@lru_cache(maxsize=64)
+def generate_checksum_bytes(data: bytes) -> str:
+    """生成CRC32校验和（对 UTF-8 编码后的牌组数据计算）
+    
+    导入时会对同一代码先校验再解析，缓存最近的结果
+    """
+    # crc32 已返回无符号数；取高16位，等价于 f"{crc:08x}"[:4]
+    return f"{zlib.crc32(data) >> 16:04x}"
+
+DECK_CODE_COMPRESS_MIN = 40  # 数据超过该长度时尝试压缩
+DECK_CODE_ZLIB_PREFIX = b'z'
+MAX_DECK_PAYLOAD = 4096  # 解压后数据的上限，远大于最大牌组，防止构造的代码解压出海量数据
 
 def encode_deck_code(data: str) -> str:
-    """编码牌组代码"""
-    checksum = generate_checksum(data)
-    combined = f"{data}|{checksum}"
-    return base64.b64encode(combined.encode('utf-8')).decode('utf-8')
+    """编码牌组代码
+    
+    较长的牌组数据（大量重复的卡牌 id）先用 zlib 压缩并加 'z' 前缀，
+    压缩后更短时才采用
+    """
+    raw = data.encode('utf-8')
+    combined = b''.join((raw, b'|', generate_checksum_bytes(raw).encode('ascii')))
+    if len(raw) > DECK_CODE_COMPRESS_MIN:
+        packed = DECK_CODE_ZLIB_PREFIX + zlib.compress(combined, 9)
+        if len(packed) < len(combined):
+            combined = packed
+    return base64.b64encode(combined).decode('ascii')
 
 def decode_deck_code(code: str) -> Optional[Tuple[str, bool]]:
-    """解码牌组代码"""
+    """解码牌组代码（兼容未压缩的旧代码）"""
     try:
-        decoded = base64.b64decode(code).decode('utf-8')
-        parts = decoded.split('|')
+        combined = base64.b64decode(code)
+        if combined.startswith(DECK_CODE_ZLIB_PREFIX):
+            # 旧代码中以 z 开头的牌组名解压会失败，按未压缩处理
+            try:
+                inflater = zlib.decompressobj()
+                payload = inflater.decompress(combined[1:], MAX_DECK_PAYLOAD)
+                if inflater.unconsumed_tail:
+                    # 解压结果超出上限，不可能是正常牌组
+                    return None, False
+                if not inflater.eof:
+                    raise zlib.error("incomplete or truncated stream")
+                combined = payload
+            except zlib.error:
+                pass
+        parts = combined.split(b'|')
         if len(parts) != 2:
             return None, False
-        data, checksum = parts
-        if generate_checksum(data) != checksum:
+        raw, checksum = parts
+        if generate_checksum_bytes(raw) != checksum.decode('ascii'):
             return None, False
-        return data, True
+        return raw.decode('utf-8'), True
     except Exception:
         return None, False
 
+# 图像与文字的绘制缓存
+@lru_cache(maxsize=512)
+def render_text(font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+    """渲染文字（按 字体/文本/颜色 缓存结果，避免每帧重复光栅化）"""
+    return display_format(font.render(text, True, color))
+
+def display_format(surf: pygame.Surface, alpha: bool = True) -> pygame.Surface:
+    """将要缓存的表面转换为显示表面的像素格式，避免每次 blit 时再转换
+    
+    窗口创建之前没有目标格式，原样返回
+    """
+    if pygame.display.get_surface() is None:
+        return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+_IMAGE_CACHE: Dict[str, pygame.Surface] = {}
+_MISSING_IMAGES: Set[str] = set()
+_CONVERTED_IMAGES: Set[str] = set()
+_SCALED_IMAGES: Dict[Tuple[str, Tuple[int, int]], pygame.Surface] = {}
+
+def load_image(path: Optional[str]) -> Optional[pygame.Surface]:
+    """加载图片（按路径缓存解码结果，每个文件只读取一次）
+    
+    不存在或加载失败的路径也会记录下来，之后不再访问磁盘；
+    窗口创建后第一次取用时转换为显示格式（convert_alpha），之后直接返回
+    """
+    if not path or path in _MISSING_IMAGES:
+        return None
+    surf = _IMAGE_CACHE.get(path)
+    if surf is None:
+        try:
+            surf = pygame.image.load(path)
+        except:
+            _MISSING_IMAGES.add(path)
+            return None
+        _IMAGE_CACHE[path] = surf
+    if path not in _CONVERTED_IMAGES and pygame.display.get_surface() is not None:
+        surf = _IMAGE_CACHE[path] = surf.convert_alpha()
+        _CONVERTED_IMAGES.add(path)
+    return surf
+
+def load_scaled_image(path: Optional[str], size: Tuple[int, int]) -> Optional[pygame.Surface]:
+    """加载并缩放图片（按 路径/尺寸 缓存缩放结果，同尺寸的组件共用一份）"""
+    key = (path, size)
+    scaled = _SCALED_IMAGES.get(key)
+    if scaled is None:
+        surf = load_image(path)
+        if surf is None:
+            return None
+        scaled = pygame.transform.scale(surf, size)
+        # 只缓存已转换为显示格式的结果
+        if path in _CONVERTED_IMAGES:
+            _SCALED_IMAGES[key] = scaled
+    return scaled
+
+if hasattr(pygame.Surface, 'fblits'):
+    def blit_batch(surface: pygame.Surface, seq) -> None:
+        """批量 blit（pygame-ce 提供 fblits，不返回矩形列表，开销最小）"""
+        surface.fblits(seq)
+else:
+    def blit_batch(surface: pygame.Surface, seq) -> None:
+        """批量 blit（pygame 没有 fblits 时退回 blits）"""
+        surface.blits(seq, doreturn=False)
+
+ELEMENT_MARK_RADIUS = 7
+
+@lru_cache(maxsize=None)
+def element_mark(element: int) -> pygame.Surface:
+    """元素标记圆点（每种元素只绘制一次，之后直接 blit）"""
+    size = ELEMENT_MARK_RADIUS * 2 + 1
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    color = ELEMENT_COLORS.get(element, (150, 150, 150))
+    pygame.draw.circle(surf, color, (ELEMENT_MARK_RADIUS, ELEMENT_MARK_RADIUS), ELEMENT_MARK_RADIUS)
+    return display_format(surf)
+
+@lru_cache(maxsize=None)
+def card_frame(width: int, height: int,
+               rim_color: Optional[Tuple[int, int, int]]) -> pygame.Surface:
+    """卡牌底板：外框 + 卡面底色 + 边框（按 尺寸/外框颜色 只绘制一次）
+    
+    外框比卡面大 2 像素，rim_color 为 None 时不画外框
+    """
+    surf = pygame.Surface((width + 4, height + 4), pygame.SRCALPHA)
+    card_rect = pygame.Rect(2, 2, width, height)
+    if rim_color is not None:
+        pygame.draw.rect(surf, rim_color, surf.get_rect(), border_radius=8)
+    pygame.draw.rect(surf, COLOR_CARD_BG, card_rect, border_radius=8)
+    pygame.draw.rect(surf, COLOR_CARD_BORDER, card_rect, 2, border_radius=8)
+    return display_format(surf)
+
+@lru_cache(maxsize=None)
+def char_slot_frame() -> pygame.Surface:
+    """对战中前场角色槽位的底板：卡面底色 + 边框 + 血条/能量条底色（只绘制一次）"""
+    surf = pygame.Surface((180, 120), pygame.SRCALPHA)
+    pygame.draw.rect(surf, COLOR_CARD_BG, surf.get_rect(), border_radius=8)
+    pygame.draw.rect(surf, COLOR_CARD_BORDER, surf.get_rect(), 2, border_radius=8)
+    pygame.draw.rect(surf, (50, 50, 50), (10, 40, 160, 15))
+    pygame.draw.rect(surf, (30, 30, 30), (10, 60, 160, 15))
+    return display_format(surf)
+
+@lru_cache(maxsize=None)
+def card_outline(width: int, height: int, color: Tuple[int, int, int]) -> pygame.Surface:
+    """卡牌选中/悬停时叠加的圆角边框"""
+    surf = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(surf, color, surf.get_rect(), 2, border_radius=8)
+    return display_format(surf)
+
 # ============= 核心数据类 =============
 
 @dataclass
@@ -205,18 +375,26 @@ class Character:
     passive_ability: str
     passive_description: str
     image_path: Optional[str] = None
+    elem_mask: int = field(init=False, repr=False, compare=False)
     
-    def has_element(self, element: Element) -> bool:
-        return element in self.elements
+    def __post_init__(self):
+        # id 在牌组编码、网络消息和查找表中反复出现，驻留后比较只需比指针
+        self.id = sys.intern(self.id)
+        self.elem_mask = element_mask(self.elements)
     
-    def get_image(self) -> Optional[pygame.Surface]:
-        """获取角色图片"""
-        if self.image_path and os.path.exists(self.image_path):
-            try:
-                return pygame.image.load(self.image_path)
-            except:
-                pass
-        return None
+    def has_element(self, element: Element) -> bool:
+        return bool(self.elem_mask & (1 << element))
+    
+    @cached_property
+    def is_mage(self) -> bool:
+        """是否为法师（拥有非物理元素），元素在对局中不变，只计算一次"""
+        return any(e != Element.PHYSICAL for e in self.elements)
+    
+    def get_image(self, size: Optional[Tuple[int, int]] = None) -> Optional[pygame.Surface]:
+        """获取角色图片（指定 size 时返回缓存的缩放结果）"""
+        if size is not None:
+            return load_scaled_image(self.image_path, size)
+        return load_image(self.image_path)
 
 @dataclass
 class Card:
@@ -231,27 +409,37 @@ class Card:
     defense: int = 0
     health: int = 0
     image_path: Optional[str] = None
-    
-    @property
-    def card_type(self) -> CardType:
+    display_name: str = field(init=False, repr=False, compare=False)
+    card_type: CardType = field(init=False, repr=False, compare=False)
+    elem_mask: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.id = sys.intern(self.id)
+        # 对战手牌上显示的截断名称，加载时一次算好
+        self.display_name = self.name[:10]
+        self.elem_mask = element_mask(self.elements)
+        # 攻防血均为 0 的是法术，卡牌数据加载后不再变化
         if self.attack == 0 and self.defense == 0 and self.health == 0:
-            return CardType.SPELL
-        return CardType.CREATURE
+            self.card_type = CardType.SPELL
+        else:
+            self.card_type = CardType.CREATURE
     
     def has_element(self, element: Element) -> bool:
-        return element in self.elements
+        return bool(self.elem_mask & (1 << element))
+    
+    @cached_property
+    def is_physical(self) -> bool:
+        """是否为物理牌"""
+        return Element.PHYSICAL in self.elements
     
     def serialize(self) -> str:
         return self.id
     
-    def get_image(self) -> Optional[pygame.Surface]:
-        """获取卡牌图片"""
-        if self.image_path and os.path.exists(self.image_path):
-            try:
-                return pygame.image.load(self.image_path)
-            except:
-                pass
-        return None
+    def get_image(self, size: Optional[Tuple[int, int]] = None) -> Optional[pygame.Surface]:
+        """获取卡牌图片（指定 size 时返回缓存的缩放结果）"""
+        if size is not None:
+            return load_scaled_image(self.image_path, size)
+        return load_image(self.image_path)
 
 class Deck:
     """牌组类"""
@@ -261,9 +449,12 @@ class Deck:
         self.cards: List[Card] = []
         self.characters: List[Character] = []
         self.deck_elements: List[Element] = []
-        self.deck_code = ""
         self.max_card_limit = 20
-        self._update_deck_code()
+        # 牌组代码在读取时才重新生成，连续修改只标记一次
+        self._deck_code = ""
+        self._code_dirty = True
+        # 合法性只在牌组内容变化时重新判断
+        self._valid = False
     
     def add_card(self, card: Card) -> bool:
         if self.deck_type == DeckType.STANDARD and card.rarity == Rarity.FUNNY:
@@ -272,7 +463,8 @@ class Deck:
             return False
         self.cards.append(card)
         self._update_deck_elements()
-        self._update_deck_code()
+        self._recompute_valid()
+        self._code_dirty = True
         return True
     
     def remove_card(self, card_name: str) -> bool:
@@ -280,7 +472,8 @@ class Deck:
             if card.name == card_name:
                 self.cards.pop(i)
                 self._update_deck_elements()
-                self._update_deck_code()
+                self._recompute_valid()
+                self._code_dirty = True
                 return True
         return False
     
@@ -288,30 +481,47 @@ class Deck:
         if len(self.characters) >= 3:
             return False
         self.characters.append(character)
-        self._update_deck_code()
+        self._recompute_valid()
+        self._code_dirty = True
         return True
     
     def remove_character(self, character_name: str) -> bool:
         for i, char in enumerate(self.characters):
             if char.name == character_name:
                 self.characters.pop(i)
-                self._update_deck_code()
+                self._recompute_valid()
+                self._code_dirty = True
                 return True
         return False
     
     def is_valid(self) -> bool:
-        return len(self.cards) >= 20 and len(self.characters) == 3
+        return self._valid
+    
+    def _recompute_valid(self):
+        self._valid = len(self.cards) >= 20 and len(self.characters) == 3
     
     def _update_deck_elements(self):
-        elements = set()
+        mask = 0
         for card in self.cards:
-            elements.update(card.elements)
-        self.deck_elements = sorted(list(elements))
+            mask |= card.elem_mask
+        self.deck_elements = [e for e in Element if mask & (1 << e)]
+    
+    @property
+    def deck_code(self) -> str:
+        if self._code_dirty:
+            self._update_deck_code()
+        return self._deck_code
+    
+    @deck_code.setter
+    def deck_code(self, code: str):
+        self._deck_code = code
+        self._code_dirty = False
     
     def _update_deck_code(self):
         char_ids = ','.join(char.id for char in self.characters)
         card_ids = ','.join(card.serialize() for card in self.cards)
-        data = f"{self.name};{int(self.deck_type)};{char_ids};{card_ids};{self.max_card_limit};"
+        data = ';'.join((self.name, str(int(self.deck_type)), char_ids, card_ids,
+                         str(self.max_card_limit), ''))
         self.deck_code = encode_deck_code(data)
     
     def import_from_code(self, code: str, all_cards: List[Card], 
@@ -325,26 +535,28 @@ class Deck:
                 return False
             self.name = parts[0]
             self.deck_type = DeckType(int(parts[1]))
+            # 先建立 id 索引，逐个查找时不必线性扫描
+            chars_by_id = {c.id: c for c in all_characters}
+            cards_by_id = {c.id: c for c in all_cards}
             char_ids = parts[2].split(',') if parts[2] else []
             self.characters = []
             for char_id in char_ids:
-                if char_id:
-                    char = next((c for c in all_characters if c.id == char_id), None)
-                    if char:
-                        self.characters.append(char)
+                char = chars_by_id.get(char_id)
+                if char:
+                    self.characters.append(char)
             card_ids = parts[3].split(',') if parts[3] else []
             self.cards = []
             for card_id in card_ids:
-                if card_id:
-                    card = next((c for c in all_cards if c.id == card_id), None)
-                    if card:
-                        self.cards.append(card)
+                card = cards_by_id.get(card_id)
+                if card:
+                    self.cards.append(card)
             if len(parts) >= 5:
                 try:
                     self.max_card_limit = int(parts[4])
                 except ValueError:
                     pass
             self._update_deck_elements()
+            self._recompute_valid()
             self.deck_code = code
             return True
         except Exception:
@@ -355,6 +567,7 @@ class CharacterDatabase:
     def __init__(self):
         self.all_characters: List[Character] = []
         self._initialize_characters()
+        self._by_id: Dict[str, Character] = {c.id: c for c in self.all_characters}
     
     def _initialize_characters(self):
         self.all_characters = [
@@ -380,13 +593,14 @@ class CharacterDatabase:
         return self.all_characters
     
     def find_character_by_id(self, char_id: str) -> Optional[Character]:
-        return next((c for c in self.all_characters if c.id == char_id), None)
+        return self._by_id.get(char_id)
 
 class CardDatabase:
     """卡牌数据库"""
     def __init__(self):
         self.all_cards: List[Card] = []
         self._initialize_cards()
+        self._by_id: Dict[str, Card] = {c.id: c for c in self.all_cards}
     
     def _initialize_cards(self):
         self.all_cards = [
@@ -438,7 +652,7 @@ class CardDatabase:
         return self.all_cards
     
     def find_card_by_id(self, card_id: str) -> Optional[Card]:
-        return next((c for c in self.all_cards if c.id == card_id), None)
+        return self._by_id.get(card_id)
 
 # ============= UI组件 =============
 
@@ -451,15 +665,30 @@ class Button:
         self.font = get_chinese_font(font_size)
         self.callback = callback
         self.hovered = False
+        # 普通/悬停两种外观，首次绘制时各渲染一次
+        self._surf_normal: Optional[pygame.Surface] = None
+        self._surf_hover: Optional[pygame.Surface] = None
     
-    def draw(self, screen: pygame.Surface):
-        color = COLOR_BUTTON_HOVER if self.hovered else COLOR_BUTTON
-        pygame.draw.rect(screen, color, self.rect, border_radius=8)
-        pygame.draw.rect(screen, COLOR_CARD_BORDER, self.rect, 2, border_radius=8)
+    def _bake(self, color: Tuple[int, int, int]) -> pygame.Surface:
+        """将底色、边框和文字预渲染到一张表面上"""
+        surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = surf.get_rect()
+        pygame.draw.rect(surf, color, local_rect, border_radius=8)
+        pygame.draw.rect(surf, COLOR_CARD_BORDER, local_rect, 2, border_radius=8)
         
         text_surf = self.font.render(self.text, True, COLOR_TEXT)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        surf.blit(text_surf, text_surf.get_rect(center=local_rect.center))
+        return display_format(surf)
+    
+    def draw(self, screen: pygame.Surface):
+        if self.hovered:
+            if self._surf_hover is None:
+                self._surf_hover = self._bake(COLOR_BUTTON_HOVER)
+            screen.blit(self._surf_hover, self.rect)
+        else:
+            if self._surf_normal is None:
+                self._surf_normal = self._bake(COLOR_BUTTON)
+            screen.blit(self._surf_normal, self.rect)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.MOUSEMOTION:
@@ -476,67 +705,92 @@ class CardWidget:
     def __init__(self, card: Card, x: int, y: int, width: int = 120, height: int = 180):
         self.card = card
         self.rect = pygame.Rect(x, y, width, height)
+        self.original_y = y  # 未滚动时的纵坐标，滚动时 rect.y = original_y - 偏移
         self.font_name = get_chinese_font(20)
         self.font_cost = get_chinese_font(32)
         self.font_desc = get_chinese_font(16)
         self.hovered = False
         self.selected = False
-    
-    def draw(self, screen: pygame.Surface):
-        # 卡牌背景
-        border_color = COLOR_CARD_BORDER
-        if self.selected:
-            border_color = (255, 255, 100)
-        elif self.hovered:
-            border_color = (150, 150, 200)
-        
-        # 稀有度边框
+        self._surf: Optional[pygame.Surface] = None
+        # 元素标记在缓存表面内的圆心（相对外框左上角）
+        self._elem_centers = [(14 + i * 18, 119) for i in range(3)]
+        self._update_layout()
+
+    def _update_layout(self):
+        """预计算外框位置（随 rect 移动而更新）"""
+        self._layout_y = self.rect.y
+        self._outer_rect = self.rect.inflate(4, 4)
+
+    def _bake(self):
+        """将静态内容（边框、插图、文字、元素标记）预渲染到缓存表面"""
+        width, height = self.rect.size
+
+        # 稀有度边框（同稀有度的卡牌共用底板）
         rarity_color = RARITY_COLORS.get(self.card.rarity, COLOR_CARD_BORDER)
-        pygame.draw.rect(screen, rarity_color, self.rect.inflate(4, 4), border_radius=8)
-        pygame.draw.rect(screen, COLOR_CARD_BG, self.rect, border_radius=8)
-        pygame.draw.rect(screen, border_color, self.rect, 2, border_radius=8)
-        
+        surf = card_frame(width, height, rarity_color).copy()
+
         # 尝试加载卡牌图片
-        img = self.card.get_image()
+        img = self.card.get_image((width - 10, 80))
         if img:
-            img = pygame.transform.scale(img, (self.rect.width - 10, 80))
-            screen.blit(img, (self.rect.x + 5, self.rect.y + 5))
+            surf.blit(img, (7, 7))
         else:
             # 无图片时显示占位符
-            placeholder = pygame.Rect(self.rect.x + 5, self.rect.y + 5, 
-                                     self.rect.width - 10, 80)
-            pygame.draw.rect(screen, (60, 60, 80), placeholder, border_radius=4)
-        
+            placeholder = pygame.Rect(7, 7, width - 10, 80)
+            pygame.draw.rect(surf, (60, 60, 80), placeholder, border_radius=4)
+
         # 费用
         cost_surf = self.font_cost.render(str(self.card.cost), True, COLOR_MANA_BAR)
-        screen.blit(cost_surf, (self.rect.x + 10, self.rect.y + 10))
-        
+        surf.blit(cost_surf, (12, 12))
+
         # 卡名
         name_surf = self.font_name.render(self.card.name[:8], True, COLOR_TEXT)
-        screen.blit(name_surf, (self.rect.x + 5, self.rect.y + 90))
-        
+        surf.blit(name_surf, (7, 92))
+
         # 元素标记
         for i, elem in enumerate(self.card.elements[:3]):
-            elem_color = ELEMENT_COLORS.get(elem, (150, 150, 150))
-            elem_rect = pygame.Rect(self.rect.x + 5 + i * 18, self.rect.y + 110, 15, 15)
-            pygame.draw.circle(screen, elem_color, elem_rect.center, 7)
-        
+            cx, cy = self._elem_centers[i]
+            surf.blit(element_mark(elem), (cx - ELEMENT_MARK_RADIUS, cy - ELEMENT_MARK_RADIUS))
+
         # 描述（简化）
-        desc_lines = self.wrap_text(self.card.description, self.rect.width - 10)
+        desc_lines = self.wrap_text(self.card.description, width - 10)
         for i, line in enumerate(desc_lines[:3]):
             desc_surf = self.font_desc.render(line, True, COLOR_TEXT_DIM)
-            screen.blit(desc_surf, (self.rect.x + 5, self.rect.y + 130 + i * 16))
+            surf.blit(desc_surf, (7, 132 + i * 16))
+
+        self._surf = display_format(surf)
+
+    def blit_item(self) -> Tuple[pygame.Surface, pygame.Rect]:
+        """返回 (缓存表面, 目标位置)，供场景合并成一次 blits 调用"""
+        if self._surf is None:
+            self._bake()
+        if self.rect.y != self._layout_y:
+            self._update_layout()
+        return self._surf, self._outer_rect
+
+    def draw(self, screen: pygame.Surface):
+        screen.blit(*self.blit_item())
+        self.draw_highlight(screen)
+
+    def draw_highlight(self, screen: pygame.Surface):
+        """选中/悬停时只叠加一层边框"""
+        if self.selected:
+            screen.blit(card_outline(self.rect.width, self.rect.height, (255, 255, 100)), self.rect)
+        elif self.hovered:
+            screen.blit(card_outline(self.rect.width, self.rect.height, (150, 150, 200)), self.rect)
     
     def wrap_text(self, text: str, max_width: int) -> List[str]:
-        """文本换行"""
-        words = text
-        if len(words) * 8 <= max_width:
-            return [words]
+        """文本换行（按描述字体的实际像素宽度逐字贪心断行，中英文混排也能对齐）"""
+        font = self.font_desc
+        if font.size(text)[0] <= max_width:
+            return [text]
         
         lines = []
-        chunk_size = max_width // 8
-        for i in range(0, len(words), chunk_size):
-            lines.append(words[i:i+chunk_size])
+        start = 0
+        for end in range(1, len(text) + 1):
+            if end - start > 1 and font.size(text[start:end])[0] > max_width:
+                lines.append(text[start:end - 1])
+                start = end - 1
+        lines.append(text[start:])
         return lines
     
     def handle_event(self, event: pygame.event.Event) -> bool:
@@ -554,10 +808,17 @@ class CharacterWidget:
                  width: int = 150, height: int = 200):
         self.character = character
         self.rect = pygame.Rect(x, y, width, height)
+        self.original_y = y  # 未滚动时的纵坐标，滚动时 rect.y = original_y - 偏移
         self.font_name = get_chinese_font(24)
         self.font_stat = get_chinese_font(20)
         self.hovered = False
         self.selected = False
+        # 组件尺寸固定，插图只在创建时缩放一次
+        self._art = character.get_image((width - 10, 100))
+        # 角色名与属性在角色定义中不变，文字也只渲染一次
+        self._name_surf = render_text(self.font_name, character.name, COLOR_TEXT)
+        self._hp_surf = render_text(self.font_stat, f"HP: {character.health}", COLOR_HP_BAR)
+        self._mp_surf = render_text(self.font_stat, f"MP: {character.energy}", COLOR_ENERGY_BAR)
     
     def draw(self, screen: pygame.Surface):
         border_color = (255, 255, 100) if self.selected else COLOR_CARD_BORDER
@@ -567,27 +828,20 @@ class CharacterWidget:
         pygame.draw.rect(screen, COLOR_CARD_BG, self.rect, border_radius=8)
         pygame.draw.rect(screen, border_color, self.rect, 2, border_radius=8)
         
-        # 尝试加载角色图片
-        img = self.character.get_image()
-        if img:
-            img = pygame.transform.scale(img, (self.rect.width - 10, 100))
-            screen.blit(img, (self.rect.x + 5, self.rect.y + 5))
+        x, y = self.rect.topleft
+        # 角色名、生命值、能量
+        blits = [(self._name_surf, (x + 10, y + 110)),
+                 (self._hp_surf, (x + 10, y + 140)),
+                 (self._mp_surf, (x + 10, y + 165))]
+        
+        # 角色图片
+        if self._art:
+            blits.append((self._art, (x + 5, y + 5)))
         else:
-            placeholder = pygame.Rect(self.rect.x + 5, self.rect.y + 5,
-                                     self.rect.width - 10, 100)
+            placeholder = pygame.Rect(x + 5, y + 5, self.rect.width - 10, 100)
             pygame.draw.rect(screen, (80, 60, 60), placeholder, border_radius=4)
         
-        # 角色名
-        name_surf = self.font_name.render(self.character.name, True, COLOR_TEXT)
-        screen.blit(name_surf, (self.rect.x + 10, self.rect.y + 110))
-        
-        # 生命值
-        hp_surf = self.font_stat.render(f"HP: {self.character.health}", True, COLOR_HP_BAR)
-        screen.blit(hp_surf, (self.rect.x + 10, self.rect.y + 140))
-        
-        # 能量
-        mp_surf = self.font_stat.render(f"MP: {self.character.energy}", True, COLOR_ENERGY_BAR)
-        screen.blit(mp_surf, (self.rect.x + 10, self.rect.y + 165))
+        blit_batch(screen, blits)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         if event.type == pygame.MOUSEMOTION:
@@ -602,8 +856,18 @@ class CharacterWidget:
 
 class Scene:
     """场景基类"""
+    # 是否为主菜单（主菜单按 ESC 退出游戏，其他场景按 ESC 返回主菜单）
+    is_main_menu = False
+    
     def __init__(self, game):
         self.game = game
+        # 画面是否需要重绘；主循环只在 dirty 时调用 draw 并刷新显示
+        self.dirty = True
+        # draw 只重绘了局部时填入这些区域，主循环只把它们刷新到窗口
+        self.update_rects: Optional[List[pygame.Rect]] = None
+    
+    def mark_dirty(self):
+        self.dirty = True
     
     def handle_event(self, event: pygame.event.Event):
         pass
@@ -616,6 +880,8 @@ class Scene:
 
 class MainMenuScene(Scene):
     """主菜单场景"""
+    is_main_menu = True
+    
     def __init__(self, game):
         super().__init__(game)
         self.title_font = get_chinese_font(72)
@@ -635,6 +901,8 @@ class MainMenuScene(Scene):
         ]
     
     def handle_event(self, event: pygame.event.Event):
+        if event.type not in WIDGET_EVENTS:
+            return
         for button in self.buttons:
             button.handle_event(event)
     
@@ -642,7 +910,7 @@ class MainMenuScene(Scene):
         screen.fill(COLOR_BG)
         
         # 标题
-        title_surf = self.title_font.render("魔法伤痕", True, COLOR_TEXT)
+        title_surf = render_text(self.title_font, "魔法伤痕", COLOR_TEXT)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH//2, 120))
         screen.blit(title_surf, title_rect)
         
@@ -652,11 +920,15 @@ class MainMenuScene(Scene):
 
 class CardViewerScene(Scene):
     """卡牌查看器场景"""
+    GRID_TOP = 78  # 网格表面顶端（含卡牌外框的 2 像素）
+    
     def __init__(self, game):
         super().__init__(game)
         self.cards = game.card_db.get_all_cards()
         self.card_widgets = []
         self.scroll_offset = 0
+        self._grid: Optional[pygame.Surface] = None
+        self.font_title = get_chinese_font(48)
         self.create_widgets()
         
         self.back_button = Button(20, 20, 100, 40, "返回",
@@ -672,30 +944,46 @@ class CardViewerScene(Scene):
             self.card_widgets.append(widget)
             x += 140
     
+    def _get_grid(self) -> pygame.Surface:
+        """把所有卡牌一次性合成到一张大表面上，滚动时只需整体 blit"""
+        if self._grid is None:
+            # 按未滚动时的位置排布（外框比卡牌大 2 像素）
+            bottom = max((w.original_y + w.rect.height + 2 for w in self.card_widgets),
+                         default=self.GRID_TOP)
+            grid = pygame.Surface((SCREEN_WIDTH, bottom - self.GRID_TOP), pygame.SRCALPHA)
+            blits = []
+            for widget in self.card_widgets:
+                surf, _ = widget.blit_item()
+                blits.append((surf, (widget.rect.x - 2, widget.original_y - 2 - self.GRID_TOP)))
+            blit_batch(grid, blits)
+            self._grid = display_format(grid)
+        return self._grid
+    
     def handle_event(self, event: pygame.event.Event):
         self.back_button.handle_event(event)
         
         if event.type == pygame.MOUSEWHEEL:
             self.scroll_offset -= event.y * 30
             self.scroll_offset = max(0, min(self.scroll_offset, 400))
+            for widget in self.card_widgets:
+                widget.rect.y = widget.original_y - self.scroll_offset
         
-        for widget in self.card_widgets:
-            widget.handle_event(event)
+        if event.type in WIDGET_EVENTS:
+            for widget in self.card_widgets:
+                widget.handle_event(event)
     
     def draw(self, screen: pygame.Surface):
         screen.fill(COLOR_BG)
         
         # 标题
-        font = get_chinese_font(48)
-        title = font.render("卡牌图鉴", True, COLOR_TEXT)
+        title = render_text(self.font_title, "卡牌图鉴", COLOR_TEXT)
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 25))
         
-        # 卡牌
+        # 卡牌：整张网格表面按滚动偏移 blit，再叠加选中/悬停边框
+        screen.blit(self._get_grid(), (0, self.GRID_TOP - self.scroll_offset))
         for widget in self.card_widgets:
-            widget.rect.y = widget.rect.y - self.scroll_offset if hasattr(widget, 'original_y') else widget.rect.y
-            if not hasattr(widget, 'original_y'):
-                widget.original_y = widget.rect.y
-            widget.draw(screen)
+            if widget.selected or widget.hovered:
+                widget.draw_highlight(screen)
         
         self.back_button.draw(screen)
 
@@ -705,6 +993,7 @@ class CharacterViewerScene(Scene):
         super().__init__(game)
         self.characters = game.character_db.get_all_characters()
         self.char_widgets = []
+        self.font_title = get_chinese_font(48)
         self.create_widgets()
         
         self.back_button = Button(20, 20, 100, 40, "返回",
@@ -718,14 +1007,14 @@ class CharacterViewerScene(Scene):
     
     def handle_event(self, event: pygame.event.Event):
         self.back_button.handle_event(event)
-        for widget in self.char_widgets:
-            widget.handle_event(event)
+        if event.type in WIDGET_EVENTS:
+            for widget in self.char_widgets:
+                widget.handle_event(event)
     
     def draw(self, screen: pygame.Surface):
         screen.fill(COLOR_BG)
         
-        font = get_chinese_font(48)
-        title = font.render("角色图鉴", True, COLOR_TEXT)
+        title = render_text(self.font_title, "角色图鉴", COLOR_TEXT)
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 25))
         
         for widget in self.char_widgets:
@@ -741,11 +1030,13 @@ class DeckBuilderScene(Scene):
         self.font = get_chinese_font(24)
         self.font_small = get_chinese_font(18)
         
-        self.deck_name = ""
+        self._name_chars: List[str] = []  # 输入中的牌组名称，逐字符追加/删除
         self.deck_type = DeckType.STANDARD
         self.selected_characters: List[Character] = []
         self.selected_cards: List[Card] = []  # 存储Card对象及其数量
         self.card_counts: Dict[str, int] = {}  # 卡牌ID -> 数量
+        self._total_cards = 0  # card_counts 各项之和，随点击增减
+        self._selected_card_ids: Set[str] = set()  # 数量大于 0 的卡牌ID，随点击增减
         
         self.stage = 0  # 0=名称, 1=类型, 2=角色, 3=卡牌
         self.scroll_offset = 0
@@ -761,25 +1052,66 @@ class DeckBuilderScene(Scene):
                                   callback=self.next_stage)
         self.finish_button = Button(SCREEN_WIDTH - 440, SCREEN_HEIGHT - 70, 200, 50, "完成",
                                     callback=self.finish_deck)
+        
+        # 固定布局区域
+        self._input_rect = pygame.Rect(SCREEN_WIDTH//2 - 200, 300, 400, 50)
+        self._std_rect = pygame.Rect(SCREEN_WIDTH//2 - 250, 300, 200, 60)
+        self._cas_rect = pygame.Rect(SCREEN_WIDTH//2 + 50, 300, 200, 60)
+        
+        # 各阶段的静态背景层（首次进入该阶段时绘制）
+        self._stage_bg: Dict[int, pygame.Surface] = {}
+        
+        # 卡牌选择阶段的局部重绘：_stage_dirty 表示该阶段需要整屏重绘，否则只重绘 _dirty_rects
+        # （与 Scene.dirty 不同，后者只表示这一帧需要绘制）
+        self._stage_dirty = True
+        self._dirty_rects: List[pygame.Rect] = []
+        self._title_rect = pygame.Rect(0, 80, SCREEN_WIDTH, self.font_title.get_height())
+        self._button_hover = (False, False, False)
+    
+    # 角色/卡牌网格布局：(起点x, 起点y, 格宽, 格高, 列数)
+    CHAR_GRID = (100, 200, 180, 220, 4)
+    CARD_GRID = (50, 180, 140, 200, 8)
     
     def _create_widgets(self):
+        # 网格坐标 (列, 行) -> 控件，点击时直接按坐标定位
+        self._char_grid: Dict[Tuple[int, int], CharacterWidget] = {}
+        self._card_grid: Dict[Tuple[int, int], CardWidget] = {}
+        
         # 创建角色控件
         all_chars = self.game.character_db.get_all_characters()
-        x = 100
+        x0, y0, cell_w, cell_h, cols = self.CHAR_GRID
         for i, char in enumerate(all_chars):
-            widget = CharacterWidget(char, x + (i % 4) * 180, 200 + (i // 4) * 220)
+            col, row = i % cols, i // cols
+            widget = CharacterWidget(char, x0 + col * cell_w, y0 + row * cell_h)
             self.char_widgets.append(widget)
+            self._char_grid[(col, row)] = widget
         
         # 创建卡牌控件
         all_cards = self.game.card_db.get_all_cards()
-        x, y = 50, 180
+        x0, y0, cell_w, cell_h, cols = self.CARD_GRID
         for i, card in enumerate(all_cards):
-            if i > 0 and i % 8 == 0:
-                y += 200
-                x = 50
-            widget = CardWidget(card, x, y)
+            col, row = i % cols, i // cols
+            widget = CardWidget(card, x0 + col * cell_w, y0 + row * cell_h)
             self.card_widgets.append(widget)
-            x += 140
+            self._card_grid[(col, row)] = widget
+    
+    @property
+    def deck_name(self) -> str:
+        return ''.join(self._name_chars)
+    
+    @deck_name.setter
+    def deck_name(self, name: str):
+        self._name_chars = list(name)
+    
+    def _widget_at(self, grid: Dict, layout: Tuple[int, int, int, int, int], pos: Tuple[int, int]):
+        """按网格坐标查找鼠标位置下的控件"""
+        x0, y0, cell_w, cell_h, _ = layout
+        col = (pos[0] - x0) // cell_w
+        row = (pos[1] - y0 + self.scroll_offset) // cell_h
+        widget = grid.get((col, row))
+        if widget and widget.rect.collidepoint(pos):
+            return widget
+        return None
     
     def next_stage(self):
         if self.stage == 0:  # 名称输入完成
@@ -794,16 +1126,18 @@ class DeckBuilderScene(Scene):
                 print("请选择3个角色")
                 return
             self.stage = 3
+            self.scroll_offset = 0
+            self._stage_dirty = True
             # 根据牌组类型过滤卡牌
             if self.deck_type == DeckType.STANDARD:
                 self.card_widgets = [w for w in self.card_widgets if w.card.rarity != Rarity.FUNNY]
+                self._card_grid = {k: w for k, w in self._card_grid.items() if w.card.rarity != Rarity.FUNNY}
         elif self.stage == 3:  # 卡牌选择完成
             self.finish_deck()
     
     def finish_deck(self):
-        total_cards = sum(self.card_counts.values())
-        if total_cards < 20:
-            print(f"至少需要20张卡牌，当前: {total_cards}")
+        if self._total_cards < 20:
+            print(f"至少需要20张卡牌，当前: {self._total_cards}")
             return
         
         # 创建牌组
@@ -827,22 +1161,21 @@ class DeckBuilderScene(Scene):
         if self.stage == 0:  # 名称输入
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_BACKSPACE:
-                    self.deck_name = self.deck_name[:-1]
+                    if self._name_chars:
+                        self._name_chars.pop()
                 elif event.key == pygame.K_RETURN:
                     self.next_stage()
-                elif event.unicode.isprintable():
-                    self.deck_name += event.unicode
+                elif is_printable_input(event.unicode):
+                    # 输入法可能一次提交多个字符，逐字符存放以便退格只删一个
+                    self._name_chars.extend(event.unicode)
         
         elif self.stage == 1:  # 类型选择
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = event.pos
-                # 标准牌组按钮
-                std_rect = pygame.Rect(SCREEN_WIDTH//2 - 250, 300, 200, 60)
-                cas_rect = pygame.Rect(SCREEN_WIDTH//2 + 50, 300, 200, 60)
-                if std_rect.collidepoint(mouse_pos):
+                if self._std_rect.collidepoint(mouse_pos):
                     self.deck_type = DeckType.STANDARD
                     self.next_stage()
-                elif cas_rect.collidepoint(mouse_pos):
+                elif self._cas_rect.collidepoint(mouse_pos):
                     self.deck_type = DeckType.CASUAL
                     self.next_stage()
         
@@ -851,8 +1184,12 @@ class DeckBuilderScene(Scene):
                 self.scroll_offset -= event.y * 30
                 self.scroll_offset = max(0, min(self.scroll_offset, 200))
             
-            for widget in self.char_widgets:
-                if widget.handle_event(event):
+            if event.type == pygame.MOUSEMOTION:
+                for widget in self.char_widgets:
+                    widget.handle_event(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                widget = self._widget_at(self._char_grid, self.CHAR_GRID, event.pos)
+                if widget and widget.handle_event(event):
                     if widget.selected and widget.character not in self.selected_characters:
                         if len(self.selected_characters) < 3:
                             self.selected_characters.append(widget.character)
@@ -863,112 +1200,180 @@ class DeckBuilderScene(Scene):
             if event.type == pygame.MOUSEWHEEL:
                 self.scroll_offset -= event.y * 30
                 self.scroll_offset = max(0, min(self.scroll_offset, 600))
+                self._stage_dirty = True
             
             if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = event.pos
-                for widget in self.card_widgets:
-                    if widget.rect.collidepoint(mouse_pos):
-                        card_id = widget.card.id
-                        current_count = self.card_counts.get(card_id, 0)
-                        
-                        if event.button == 1:  # 左键增加
-                            if current_count < 3:
-                                self.card_counts[card_id] = current_count + 1
-                                if widget.card not in self.selected_cards:
-                                    self.selected_cards.append(widget.card)
-                                print(f"{widget.card.name}: {self.card_counts[card_id]}/3")
-                        elif event.button == 3:  # 右键减少
-                            if current_count > 0:
-                                self.card_counts[card_id] = current_count - 1
-                                if self.card_counts[card_id] == 0:
-                                    self.selected_cards.remove(widget.card)
-                                print(f"{widget.card.name}: {self.card_counts[card_id]}/3")
+                widget = self._widget_at(self._card_grid, self.CARD_GRID, event.pos)
+                if widget:
+                    card_id = widget.card.id
+                    current_count = self.card_counts.get(card_id, 0)
+                    
+                    if event.button == 1:  # 左键增加
+                        if current_count < 3:
+                            self.card_counts[card_id] = current_count + 1
+                            self._total_cards += 1
+                            self._selected_card_ids.add(card_id)
+                            if widget.card not in self.selected_cards:
+                                self.selected_cards.append(widget.card)
+                            self._mark_widget_dirty(widget)
+                            print(f"{widget.card.name}: {self.card_counts[card_id]}/3")
+                    elif event.button == 3:  # 右键减少
+                        if current_count > 0:
+                            self.card_counts[card_id] = current_count - 1
+                            self._total_cards -= 1
+                            if self.card_counts[card_id] == 0:
+                                self.selected_cards.remove(widget.card)
+                                self._selected_card_ids.discard(card_id)
+                            self._mark_widget_dirty(widget)
+                            print(f"{widget.card.name}: {self.card_counts[card_id]}/3")
         
         if self.stage > 1:
             self.next_button.handle_event(event)
         if self.stage == 3:
             self.finish_button.handle_event(event)
     
-    def draw(self, screen: pygame.Surface):
-        screen.fill(COLOR_BG)
+    def _mark_widget_dirty(self, widget: CardWidget):
+        """卡牌数量变化：重绘该卡牌及标题中的总数"""
+        self._dirty_rects.append(widget.rect.inflate(4, 4))
+        self._dirty_rects.append(self._title_rect)
+    
+    def _get_stage_bg(self) -> pygame.Surface:
+        """获取当前阶段的静态背景层（标题、输入框、类型按钮、提示文字）"""
+        bg = self._stage_bg.get(self.stage)
+        if bg is not None:
+            return bg
+        
+        bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        bg.fill(COLOR_BG)
         
         if self.stage == 0:  # 名称输入
-            title = self.font_title.render("创建牌组 - 输入名称", True, COLOR_TEXT)
-            screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
+            title = render_text(self.font_title, "创建牌组 - 输入名称", COLOR_TEXT)
+            bg.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
             
             # 输入框
-            input_rect = pygame.Rect(SCREEN_WIDTH//2 - 200, 300, 400, 50)
-            pygame.draw.rect(screen, COLOR_CARD_BG, input_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, input_rect, 2, border_radius=8)
-            
-            name_surf = self.font.render(self.deck_name + "|", True, COLOR_TEXT)
-            screen.blit(name_surf, (input_rect.x + 10, input_rect.y + 12))
+            pygame.draw.rect(bg, COLOR_CARD_BG, self._input_rect, border_radius=8)
+            pygame.draw.rect(bg, COLOR_CARD_BORDER, self._input_rect, 2, border_radius=8)
             
-            hint = self.font_small.render("按回车继续", True, COLOR_TEXT_DIM)
-            screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 400))
+            hint = render_text(self.font_small, "按回车继续", COLOR_TEXT_DIM)
+            bg.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 400))
         
         elif self.stage == 1:  # 类型选择
-            title = self.font_title.render("选择牌组类型", True, COLOR_TEXT)
-            screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
+            title = render_text(self.font_title, "选择牌组类型", COLOR_TEXT)
+            bg.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
             
             # 标准牌组按钮
-            std_rect = pygame.Rect(SCREEN_WIDTH//2 - 250, 300, 200, 60)
-            pygame.draw.rect(screen, COLOR_BUTTON, std_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, std_rect, 2, border_radius=8)
-            std_text = self.font.render("标准牌组", True, COLOR_TEXT)
-            screen.blit(std_text, (std_rect.centerx - std_text.get_width()//2, std_rect.centery - std_text.get_height()//2))
+            std_rect = self._std_rect
+            pygame.draw.rect(bg, COLOR_BUTTON, std_rect, border_radius=8)
+            pygame.draw.rect(bg, COLOR_CARD_BORDER, std_rect, 2, border_radius=8)
+            std_text = render_text(self.font, "标准牌组", COLOR_TEXT)
+            bg.blit(std_text, (std_rect.centerx - std_text.get_width()//2, std_rect.centery - std_text.get_height()//2))
             
-            std_desc = self.font_small.render("不能携带趣味卡", True, COLOR_TEXT_DIM)
-            screen.blit(std_desc, (std_rect.centerx - std_desc.get_width()//2, std_rect.bottom + 10))
+            std_desc = render_text(self.font_small, "不能携带趣味卡", COLOR_TEXT_DIM)
+            bg.blit(std_desc, (std_rect.centerx - std_desc.get_width()//2, std_rect.bottom + 10))
             
             # 休闲牌组按钮
-            cas_rect = pygame.Rect(SCREEN_WIDTH//2 + 50, 300, 200, 60)
-            pygame.draw.rect(screen, COLOR_BUTTON, cas_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, cas_rect, 2, border_radius=8)
-            cas_text = self.font.render("休闲牌组", True, COLOR_TEXT)
-            screen.blit(cas_text, (cas_rect.centerx - cas_text.get_width()//2, cas_rect.centery - cas_text.get_height()//2))
+            cas_rect = self._cas_rect
+            pygame.draw.rect(bg, COLOR_BUTTON, cas_rect, border_radius=8)
+            pygame.draw.rect(bg, COLOR_CARD_BORDER, cas_rect, 2, border_radius=8)
+            cas_text = render_text(self.font, "休闲牌组", COLOR_TEXT)
+            bg.blit(cas_text, (cas_rect.centerx - cas_text.get_width()//2, cas_rect.centery - cas_text.get_height()//2))
             
-            cas_desc = self.font_small.render("可携带所有卡牌", True, COLOR_TEXT_DIM)
-            screen.blit(cas_desc, (cas_rect.centerx - cas_desc.get_width()//2, cas_rect.bottom + 10))
+            cas_desc = render_text(self.font_small, "可携带所有卡牌", COLOR_TEXT_DIM)
+            bg.blit(cas_desc, (cas_rect.centerx - cas_desc.get_width()//2, cas_rect.bottom + 10))
+        
+        elif self.stage == 3:  # 卡牌选择
+            hint = render_text(self.font_small, "左键添加(最多3张) | 右键移除", COLOR_TEXT_DIM)
+            bg.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 120))
+        
+        bg = display_format(bg, alpha=False)
+        self._stage_bg[self.stage] = bg
+        return bg
+    
+    def draw(self, screen: pygame.Surface):
+        if self.stage == 3:
+            self._draw_card_stage(screen)
+            return
+        
+        screen.blit(self._get_stage_bg(), (0, 0))
+        
+        if self.stage == 0:  # 名称输入
+            name_surf = render_text(self.font, self.deck_name + "|", COLOR_TEXT)
+            screen.blit(name_surf, (self._input_rect.x + 10, self._input_rect.y + 12))
         
         elif self.stage == 2:  # 角色选择
-            title = self.font_title.render(f"选择3个角色 ({len(self.selected_characters)}/3)", True, COLOR_TEXT)
+            title = render_text(self.font_title, f"选择3个角色 ({len(self.selected_characters)}/3)", COLOR_TEXT)
             screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 80))
             
+            scroll_offset = self.scroll_offset
+            selected_characters = self.selected_characters
+            visible = screen.get_rect()
             for widget in self.char_widgets:
-                widget.selected = widget.character in self.selected_characters
-                widget.rect.y -= self.scroll_offset if not hasattr(widget, 'original_y') else 0
-                if not hasattr(widget, 'original_y'):
-                    widget.original_y = widget.rect.y
+                rect = widget.rect
+                rect.y = widget.original_y - scroll_offset
+                # 滚出屏幕的控件不绘制
+                if not visible.colliderect(rect):
+                    continue
+                widget.selected = widget.character in selected_characters
                 widget.draw(screen)
             
             self.next_button.draw(screen)
         
-        elif self.stage == 3:  # 卡牌选择
-            total_cards = sum(self.card_counts.values())
-            title = self.font_title.render(f"选择卡牌 ({total_cards}/20)", True, COLOR_TEXT)
-            screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 80))
-            
-            hint = self.font_small.render("左键添加(最多3张) | 右键移除", True, COLOR_TEXT_DIM)
-            screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 120))
-            
-            for widget in self.card_widgets:
-                widget.selected = widget.card.id in self.card_counts and self.card_counts[widget.card.id] > 0
-                widget.rect.y -= self.scroll_offset if not hasattr(widget, 'original_y') else 0
-                if not hasattr(widget, 'original_y'):
-                    widget.original_y = widget.rect.y
-                widget.draw(screen)
-                
-                # 显示数量
-                if widget.card.id in self.card_counts and self.card_counts[widget.card.id] > 0:
-                    count = self.card_counts[widget.card.id]
-                    count_surf = self.font.render(f"x{count}", True, (255, 255, 100))
-                    screen.blit(count_surf, (widget.rect.right - 35, widget.rect.top + 5))
+        self.back_button.draw(screen)
+    
+    def _draw_card_stage(self, screen: pygame.Surface):
+        """卡牌选择阶段：滚动/切换阶段时整屏重绘，否则只重绘数量变化的卡牌和按钮"""
+        buttons = (self.back_button, self.next_button, self.finish_button)
+        hover = tuple(button.hovered for button in buttons)
+        
+        if self._stage_dirty:
+            self._stage_dirty = False
+            self._dirty_rects.clear()
+            self._paint_card_stage(screen)
+        else:
+            for button, was, now in zip(buttons, self._button_hover, hover):
+                if was != now:
+                    self._dirty_rects.append(button.rect)
+            for rect in self._dirty_rects:
+                self._paint_card_stage(screen, rect)
+            self.update_rects = list(self._dirty_rects)
+            self._dirty_rects.clear()
+        
+        self._button_hover = hover
+    
+    def _paint_card_stage(self, screen: pygame.Surface, clip: Optional[pygame.Rect] = None):
+        """绘制卡牌选择阶段；给定 clip 时只绘制该区域内的内容"""
+        screen.set_clip(clip)
+        screen.blit(self._get_stage_bg(), (0, 0))
+        
+        title = render_text(self.font_title, f"选择卡牌 ({self._total_cards}/20)", COLOR_TEXT)
+        screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 80))
+        
+        # 循环内反复用到的属性先取到局部变量
+        card_counts = self.card_counts
+        selected_ids = self._selected_card_ids
+        scroll_offset = self.scroll_offset
+        font = self.font
+        blit = screen.blit
+        # 滚出屏幕或不在重绘区域内的控件不绘制（重绘区域总在屏幕内）
+        visible = clip if clip is not None else screen.get_rect()
+        for widget in self.card_widgets:
+            rect = widget.rect
+            rect.y = widget.original_y - scroll_offset
+            if not visible.colliderect(rect):
+                continue
+            card_id = widget.card.id
+            widget.selected = card_id in selected_ids
+            widget.draw(screen)
             
-            self.next_button.draw(screen)
-            self.finish_button.draw(screen)
+            # 显示数量
+            if widget.selected:
+                count_surf = render_text(font, f"x{card_counts[card_id]}", (255, 255, 100))
+                blit(count_surf, (rect.right - 35, rect.top + 5))
         
+        self.next_button.draw(screen)
+        self.finish_button.draw(screen)
         self.back_button.draw(screen)
+        screen.set_clip(None)
 
 class DeckListScene(Scene):
     """牌组列表场景"""
@@ -988,6 +1393,25 @@ class DeckListScene(Scene):
                                     callback=self.export_code)
         self.import_button = Button(SCREEN_WIDTH - 880, 20, 200, 40, "导入代码",
                                     callback=self.import_code)
+        
+        # 牌组行的文字和区域（牌组只在其他场景中增删，进入本场景时生成）
+        self._row_surfs: List[pygame.Surface] = []
+        self._row_rects: List[pygame.Rect] = []
+        self._rebuild_rows()
+    
+    def _rebuild_rows(self):
+        """根据当前牌组列表重新生成每一行的文字和区域"""
+        self._row_surfs = []
+        self._row_rects = []
+        y = 150
+        for i, deck in enumerate(self.game.decks):
+            valid = deck.is_valid()
+            valid_str = "✓" if valid else "✗"
+            text = f"{valid_str} {i+1}. {deck.name} ({len(deck.cards)}张卡牌, {len(deck.characters)}角色)"
+            self._row_surfs.append(display_format(
+                self.font_small.render(text, True, COLOR_TEXT if valid else COLOR_TEXT_DIM)))
+            self._row_rects.append(pygame.Rect(100, y, SCREEN_WIDTH - 200, 35))
+            y += 40
     
     def create_deck(self):
         self.game.change_scene(GameState.DECK_BUILDER)
@@ -1014,38 +1438,31 @@ class DeckListScene(Scene):
         
         if event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = event.pos
-            y = 150
-            for i in range(len(self.game.decks)):
-                deck_rect = pygame.Rect(100, y, SCREEN_WIDTH - 200, 35)
+            for i, deck_rect in enumerate(self._row_rects):
                 if deck_rect.collidepoint(mouse_pos):
                     self.selected_deck_index = i
                     print(f"选中牌组: {self.game.decks[i].name}")
                     return
-                y += 40
     
     def draw(self, screen: pygame.Surface):
         screen.fill(COLOR_BG)
         
-        title = self.font.render("我的牌组", True, COLOR_TEXT)
+        title = render_text(self.font, "我的牌组", COLOR_TEXT)
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 80))
         
         # 显示牌组列表
-        y = 150
-        for i, deck in enumerate(self.game.decks):
-            valid_str = "✓" if deck.is_valid() else "✗"
-            text = f"{valid_str} {i+1}. {deck.name} ({len(deck.cards)}张卡牌, {len(deck.characters)}角色)"
-            
-            # 高亮选中的牌组
-            deck_rect = pygame.Rect(100, y, SCREEN_WIDTH - 200, 35)
-            if i == self.selected_deck_index:
-                pygame.draw.rect(screen, (50, 50, 80), deck_rect, border_radius=4)
-            
-            deck_surf = self.font_small.render(text, True, COLOR_TEXT if deck.is_valid() else COLOR_TEXT_DIM)
-            screen.blit(deck_surf, (105, y + 5))
-            y += 40
+        if len(self._row_surfs) != len(self.game.decks):
+            self._rebuild_rows()
+        
+        # 高亮选中的牌组
+        if 0 <= self.selected_deck_index < len(self._row_rects):
+            pygame.draw.rect(screen, (50, 50, 80), self._row_rects[self.selected_deck_index], border_radius=4)
+        
+        blit_batch(screen, [(deck_surf, (105, deck_rect.y + 5))
+                            for deck_surf, deck_rect in zip(self._row_surfs, self._row_rects)])
         
         if not self.game.decks:
-            text = self.font.render("还没有牌组，点击右上角创建", True, COLOR_TEXT_DIM)
+            text = render_text(self.font, "还没有牌组，点击右上角创建", COLOR_TEXT_DIM)
             screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 300))
         
         self.back_button.draw(screen)
@@ -1055,12 +1472,51 @@ class DeckListScene(Scene):
             self.export_button.draw(screen)
         self.import_button.draw(screen)
 
+# ============= 战斗结算 =============
+# 纯整数运算，不依赖场景/数据类，便于批量模拟复用
+
+def split_cost(cost: int, energy: int, mana: int) -> Tuple[int, int, int]:
+    """拆分费用：依次从角色能量、基地魔力、生命支付，返回 (能量, 魔力, 生命) 各自支付量"""
+    from_char = min(energy, cost)
+    from_base = min(mana, cost - from_char)
+    return from_char, from_base, cost - from_char - from_base
+
+def card_damage(cost: int, element_match: bool) -> int:
+    """卡牌基础伤害（至少1点），元素匹配时翻倍"""
+    return max(1, cost) * (2 if element_match else 1)
+
+def absorb_damage(damage: int, is_magic: bool, target_is_mage: bool,
+                  energy: int, hp: int) -> Tuple[int, int]:
+    """结算角色受到的伤害：法师用能量抵消魔法伤害，返回 (剩余能量, 剩余生命)"""
+    if is_magic and target_is_mage:
+        absorbed = min(energy, damage)
+        energy -= absorbed
+        damage -= absorbed
+    if damage > 0:
+        hp -= damage
+    return energy, hp
+
 @dataclass
 class CharacterState:
     """角色战斗状态"""
     character: Character
     cur_hp: int
     cur_energy: int
+    max_hp: int = field(init=False)
+    max_energy: int = field(init=False)
+    is_mage: bool = field(init=False)
+    
+    def __post_init__(self):
+        # 上限与法师身份取自角色定义，对局中不变
+        self.max_hp = self.character.health
+        self.max_energy = self.character.energy
+        self.is_mage = self.character.is_mage
+    
+    def take_damage(self, damage: int, is_magic: bool) -> int:
+        """承受伤害（法师用能量抵消魔法伤害），返回超出剩余生命的溢出伤害"""
+        self.cur_energy, self.cur_hp = absorb_damage(damage, is_magic, self.is_mage,
+                                                     self.cur_energy, self.cur_hp)
+        return max(0, -self.cur_hp)
 
 @dataclass
 class PlayerBattleState:
@@ -1072,9 +1528,42 @@ class PlayerBattleState:
     deck: List[Card] = field(default_factory=list)
     hand: List[Card] = field(default_factory=list)
     discard: List[Card] = field(default_factory=list)
+    
+    def draw_card(self) -> Optional[Card]:
+        """从牌库顶（列表末尾）抽一张牌到手牌，牌库为空时返回 None"""
+        if not self.deck:
+            return None
+        card = self.deck.pop()
+        self.hand.append(card)
+        return card
+    
+    def discard_from_hand(self, index: int) -> Card:
+        """把手牌中第 index 张移入弃牌堆（保持其余手牌顺序）"""
+        card = self.hand.pop(index)
+        self.discard.append(card)
+        return card
+    
+    def regenerate(self, mana: int = 5, energy: int = 5):
+        """恢复基地魔力和所有角色能量（不超过上限）"""
+        self.base_mana = min(30, self.base_mana + mana)
+        for char_state in self.chars:
+            char_state.cur_energy = min(char_state.max_energy, char_state.cur_energy + energy)
 
 class BattleScene(Scene):
     """对战场景"""
+    # 画面分为三个条带：对手区域（含回合标题）、日志、己方区域（含手牌与按钮），
+    # 重绘后只把内容有变化的条带刷新到窗口
+    UPDATE_BANDS = (pygame.Rect(0, 0, SCREEN_WIDTH, 240),
+                    pygame.Rect(SCREEN_WIDTH - 450, 240, 450, 140),
+                    pygame.Rect(0, 380, SCREEN_WIDTH, SCREEN_HEIGHT - 380))
+    # 对手两个前场角色作为目标时的标识（基地为 "b"）
+    TARGET_SLOTS = ("t0", "t1")
+    # 打出卡牌按钮（画在静态背景层中，点击检测共用）
+    PLAY_RECT = pygame.Rect(SCREEN_WIDTH - 440, SCREEN_HEIGHT - 60, 200, 40)
+    # 日志区显示的条数与每行位置（位置固定，只有文字会变）
+    LOG_TAIL = 5
+    LOG_POSITIONS = tuple((SCREEN_WIDTH - 450, 250 + i * 20) for i in range(LOG_TAIL))
+    
     def __init__(self, game):
         super().__init__(game)
         self.font = get_chinese_font(24)
@@ -1089,7 +1578,23 @@ class BattleScene(Scene):
         self.selected_hand_index = -1
         self.selected_actor_index = -1
         self.selected_target = None  # "b" or "t0" or "t1"
-        self.battle_log = []
+        self.battle_log = deque(maxlen=10)
+        # 界面显示的最近 5 条日志及其合成后的表面，只在添加日志时重建
+        self._log_tail: Tuple[str, ...] = ()
+        self._log_surface: Optional[pygame.Surface] = None
+        
+        # 静态背景层，按 (对手前场人数, 己方前场人数) 缓存
+        self._battle_bg: Dict[Tuple[int, int], pygame.Surface] = {}
+        
+        # 卡牌名称/费用、角色名的文字，按 id 缓存（对局中不变）
+        self._card_text: Dict[str, Tuple[pygame.Surface, pygame.Surface]] = {}
+        self._char_names: Dict[str, pygame.Surface] = {}
+        
+        # 上下两个玩家区域的固定几何，绘制时只修改血条/能量条宽度
+        self._area_rects = {pos: self._make_area_rects(*pos) for pos in ((50, 80), (50, SCREEN_HEIGHT - 300))}
+        
+        # 上次绘制时各条带的内容快照，None 表示下一次需要整屏刷新
+        self._band_keys: Optional[Tuple] = None
         
         # 初始化战斗
         if not self._init_battle():
@@ -1125,18 +1630,14 @@ class BattleScene(Scene):
             cs = CharacterState(char, char.health, (char.energy + 1) // 2)
             self.player2.chars.append(cs)
         
-        # 初始化牌库并洗牌
-        self.player1.deck = deck1.cards.copy()
-        self.player2.deck = deck2.cards.copy()
-        random.shuffle(self.player1.deck)
-        random.shuffle(self.player2.deck)
+        # 初始化牌库并洗牌（random.sample 直接生成乱序副本，不改动牌组本身）
+        self.player1.deck = random.sample(deck1.cards, len(deck1.cards))
+        self.player2.deck = random.sample(deck2.cards, len(deck2.cards))
         
         # 抽初始手牌
         for _ in range(3):
-            if self.player1.deck:
-                self.player1.hand.append(self.player1.deck.pop())
-            if self.player2.deck:
-                self.player2.hand.append(self.player2.deck.pop())
+            self.player1.draw_card()
+            self.player2.draw_card()
         
         self.add_log("战斗开始！")
         return True
@@ -1144,10 +1645,24 @@ class BattleScene(Scene):
     def add_log(self, msg: str):
         """添加战斗日志"""
         self.battle_log.append(msg)
-        if len(self.battle_log) > 10:
-            self.battle_log.pop(0)
+        self._log_tail = tuple(islice(self.battle_log, max(0, len(self.battle_log) - self.LOG_TAIL), None))
+        self._rebuild_log_surface()
         print(msg)
     
+    def _rebuild_log_surface(self):
+        """把最近几条日志合成到一张表面上，绘制时只需 blit 一次
+        
+        日志区域下方是纯背景色，直接用背景色铺底生成不透明表面
+        """
+        origin_x, origin_y = self.LOG_POSITIONS[0]
+        height = self.LOG_POSITIONS[len(self._log_tail) - 1][1] - origin_y + self.font_tiny.get_height()
+        surf = pygame.Surface((SCREEN_WIDTH - origin_x, height))
+        surf.fill(COLOR_BG)
+        font_tiny = self.font_tiny
+        blit_batch(surf, [(render_text(font_tiny, log, COLOR_TEXT_DIM), (x - origin_x, y - origin_y))
+                          for log, (x, y) in zip(self._log_tail, self.LOG_POSITIONS)])
+        self._log_surface = display_format(surf, alpha=False)
+    
     def surrender(self):
         """投降"""
         current_player = self.player1 if self.current_turn == 0 else self.player2
@@ -1159,14 +1674,10 @@ class BattleScene(Scene):
         current_player = self.player1 if self.current_turn == 0 else self.player2
         
         # 恢复魔力和能量
-        current_player.base_mana = min(30, current_player.base_mana + 5)
-        for char_state in current_player.chars:
-            max_energy = char_state.character.energy
-            char_state.cur_energy = min(max_energy, char_state.cur_energy + 5)
+        current_player.regenerate()
         
         # 抽牌
-        if current_player.deck:
-            current_player.hand.append(current_player.deck.pop())
+        if current_player.draw_card():
             self.add_log(f"{current_player.name} 抽了1张牌")
         
         # 切换回合
@@ -1179,10 +1690,6 @@ class BattleScene(Scene):
         next_player = self.player1 if self.current_turn == 0 else self.player2
         self.add_log(f"--- 回合 {self.turn_number}: {next_player.name} ---")
     
-    def is_mage(self, char: Character) -> bool:
-        """判断是否为法师"""
-        return any(e != Element.PHYSICAL for e in char.elements)
-    
     def play_card(self):
         """打出卡牌"""
         if self.selected_hand_index < 0 or self.selected_actor_index < 0 or not self.selected_target:
@@ -1196,8 +1703,8 @@ class BattleScene(Scene):
         actor = current_player.chars[self.selected_actor_index]
         
         # 检查是否为物理牌
-        is_physical = Element.PHYSICAL in card.elements
-        actor_is_mage = self.is_mage(actor.character)
+        is_physical = card.is_physical
+        actor_is_mage = actor.is_mage
         
         if not actor_is_mage and not is_physical:
             self.add_log("普通人只能使用物理属性的牌")
@@ -1205,28 +1712,19 @@ class BattleScene(Scene):
         
         # 计算费用
         cost = 0 if is_physical else card.cost
-        remaining = cost
         
         if actor_is_mage and cost > 0:
-            # 从角色能量支付
-            from_char = min(actor.cur_energy, remaining)
+            # 依次从角色能量、基地魔力支付，不足部分用生命支付
+            from_char, from_base, from_hp = split_cost(cost, actor.cur_energy, current_player.base_mana)
             actor.cur_energy -= from_char
-            remaining -= from_char
-            
-            # 从基地魔力支付
-            from_base = min(current_player.base_mana, remaining)
             current_player.base_mana -= from_base
-            remaining -= from_base
-            
-            # 用生命支付剩余
-            if remaining > 0:
-                actor.cur_hp -= remaining
-                self.add_log(f"使用{remaining}点生命支付费用")
+            if from_hp > 0:
+                actor.cur_hp -= from_hp
+                self.add_log(f"使用{from_hp}点生命支付费用")
         
         # 计算伤害
-        base_dmg = max(1, card.cost)
-        element_match = any(e in actor.character.elements for e in card.elements)
-        final_dmg = base_dmg * (2 if element_match else 1)
+        element_match = bool(actor.character.elem_mask & card.elem_mask)
+        final_dmg = card_damage(card.cost, element_match)
         dmg_is_magic = not is_physical
         
         # 应用目标伤害
@@ -1234,24 +1732,17 @@ class BattleScene(Scene):
             opponent.base_hp -= final_dmg
             self.add_log(f"{actor.character.name} 使用 {card.name} 对基地造成 {final_dmg} 点伤害")
         else:
-            target_idx = 0 if self.selected_target == "t0" else 1
+            target_idx = self.TARGET_SLOTS.index(self.selected_target)
             if target_idx < len(opponent.chars):
                 target = opponent.chars[target_idx]
                 
                 # 法师用能量抵消魔法伤害
-                if dmg_is_magic and self.is_mage(target.character):
-                    energy_absorbed = min(target.cur_energy, final_dmg)
-                    target.cur_energy -= energy_absorbed
-                    final_dmg -= energy_absorbed
-                
-                if final_dmg > 0:
-                    target.cur_hp -= final_dmg
+                overflow = target.take_damage(final_dmg, dmg_is_magic)
                 
                 self.add_log(f"{actor.character.name} 使用 {card.name} 对 {target.character.name} 造成伤害")
                 
                 # 检查角色死亡和替补
                 if target.cur_hp <= 0:
-                    overflow = -target.cur_hp
                     self.add_log(f"{target.character.name} 被击败！")
                     
                     if len(opponent.chars) == 3:
@@ -1267,7 +1758,7 @@ class BattleScene(Scene):
                         self.add_log(f"溢出伤害 {overflow} 点打到基地")
         
         # 移除打出的卡牌
-        current_player.discard.append(current_player.hand.pop(self.selected_hand_index))
+        current_player.discard_from_hand(self.selected_hand_index)
         self.selected_hand_index = -1
         self.selected_actor_index = -1
         self.selected_target = None
@@ -1293,49 +1784,82 @@ class BattleScene(Scene):
             current_player = self.player1 if self.current_turn == 0 else self.player2
             opponent = self.player2 if self.current_turn == 0 else self.player1
             
-            # 选择手牌
-            hand_y = SCREEN_HEIGHT - 140
-            for i, card in enumerate(current_player.hand):
-                card_rect = pygame.Rect(50 + i * 130, hand_y, 120, 100)
-                if card_rect.collidepoint(mouse_pos):
-                    self.selected_hand_index = i
-                    self.add_log(f"选择了 {card.name}")
-                    return
+            # 选择手牌（卡牌等距排列，直接由坐标算出第几张，不逐张构造矩形）
+            offset_x = mouse_pos[0] - 50
+            offset_y = mouse_pos[1] - (SCREEN_HEIGHT - 140)
+            i = offset_x // 130
+            if (0 <= offset_x and offset_x % 130 < 120 and 0 <= offset_y < 100
+                    and i < len(current_player.hand)):
+                self.selected_hand_index = i
+                self.add_log(f"选择了 {current_player.hand[i].name}")
+                return
             
             # 选择己方角色
+            own_rects = self._area_rects[(50, SCREEN_HEIGHT - 300)]["chars"]
             for i in range(min(2, len(current_player.chars))):
-                char_rect = pygame.Rect(50 + i * 200, SCREEN_HEIGHT - 300, 180, 120)
-                if char_rect.collidepoint(mouse_pos):
+                if own_rects[i].collidepoint(mouse_pos):
                     self.selected_actor_index = i
                     self.add_log(f"选择角色 {current_player.chars[i].character.name}")
                     return
             
             # 选择对手目标
+            opponent_rects = self._area_rects[(50, 80)]
             for i in range(min(2, len(opponent.chars))):
-                char_rect = pygame.Rect(50 + i * 200, 80, 180, 120)
-                if char_rect.collidepoint(mouse_pos):
-                    self.selected_target = f"t{i}"
+                if opponent_rects["chars"][i].collidepoint(mouse_pos):
+                    self.selected_target = self.TARGET_SLOTS[i]
                     self.add_log(f"目标: {opponent.chars[i].character.name}")
                     return
             
             # 选择对手基地
-            base_rect = pygame.Rect(SCREEN_WIDTH - 250, 80, 200, 120)
-            if base_rect.collidepoint(mouse_pos):
+            if opponent_rects["base"].collidepoint(mouse_pos):
                 self.selected_target = "b"
                 self.add_log("目标: 对手基地")
                 return
             
             # 打出卡牌按钮
-            play_rect = pygame.Rect(SCREEN_WIDTH - 440, SCREEN_HEIGHT - 60, 200, 40)
-            if play_rect.collidepoint(mouse_pos):
+            if self.PLAY_RECT.collidepoint(mouse_pos):
                 self.play_card()
                 return
     
-    def draw(self, screen: pygame.Surface):
-        screen.fill(COLOR_BG)
+    def _get_battle_bg(self, top_count: int, bottom_count: int) -> pygame.Surface:
+        """获取对战静态背景层（只在前场人数变化时重新绘制）"""
+        key = (top_count, bottom_count)
+        bg = self._battle_bg.get(key)
+        if bg is not None:
+            return bg
+        
+        bg = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        bg.fill(COLOR_BG)
+        
+        for y, count in ((80, top_count), (SCREEN_HEIGHT - 300, bottom_count)):
+            # 基地信息框
+            base_rect = self._area_rects[(50, y)]["base"]
+            pygame.draw.rect(bg, COLOR_CARD_BG, base_rect, border_radius=8)
+            pygame.draw.rect(bg, COLOR_CARD_BORDER, base_rect, 2, border_radius=8)
+            base_title = render_text(self.font_small, "基地", COLOR_TEXT)
+            bg.blit(base_title, (SCREEN_WIDTH - 240, y + 10))
+            pygame.draw.rect(bg, (50, 50, 50), (SCREEN_WIDTH - 240, y + 65, 180, 15))
+            
+            # 前场角色框与血条/能量条底色（共用预绘制的槽位底板）
+            slot = char_slot_frame()
+            blit_batch(bg, [(slot, (50 + i * 200, y)) for i in range(count)])
+        
+        # 打出卡牌按钮
+        play_button_rect = self.PLAY_RECT
+        pygame.draw.rect(bg, COLOR_BUTTON, play_button_rect, border_radius=8)
+        pygame.draw.rect(bg, COLOR_CARD_BORDER, play_button_rect, 2, border_radius=8)
+        play_text = render_text(self.font_small, "打出卡牌", COLOR_TEXT)
+        bg.blit(play_text, (play_button_rect.centerx - play_text.get_width()//2,
+                            play_button_rect.centery - play_text.get_height()//2))
         
+        bg = display_format(bg, alpha=False)
+        self._battle_bg[key] = bg
+        return bg
+    
+    def draw(self, screen: pygame.Surface):
         if not self.battle_started:
-            title = self.font.render("无法开始对战，需要至少2个牌组", True, COLOR_TEXT)
+            screen.fill(COLOR_BG)
+            title = render_text(self.font, "无法开始对战，需要至少2个牌组", COLOR_TEXT)
             screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 300))
             self.back_button.draw(screen)
             return
@@ -1343,145 +1867,185 @@ class BattleScene(Scene):
         current_player = self.player1 if self.current_turn == 0 else self.player2
         opponent = self.player2 if self.current_turn == 0 else self.player1
         
+        # 静态背景（区域框、血条底色、打出卡牌按钮）
+        screen.blit(self._get_battle_bg(min(2, len(opponent.chars)),
+                                        min(2, len(current_player.chars))), (0, 0))
+        
         # 绘制对手区域
         self.draw_player_area(screen, opponent, 50, 80, False)
         
         # 绘制己方区域
         self.draw_player_area(screen, current_player, 50, SCREEN_HEIGHT - 300, True)
         
-        # 绘制手牌
+        # 绘制手牌（先画卡框，文字和日志收集后一次批量 blit）
+        blits = []
+        append = blits.append
+        blit = screen.blit
+        get_card_text = self._get_card_text
+        selected = self.selected_hand_index
         hand_y = SCREEN_HEIGHT - 140
         for i, card in enumerate(current_player.hand):
             x = 50 + i * 130
-            card_rect = pygame.Rect(x, hand_y, 120, 100)
             
-            # 高亮选中的牌
-            if i == self.selected_hand_index:
-                pygame.draw.rect(screen, (255, 255, 100), card_rect.inflate(4, 4), border_radius=8)
+            # 卡框使用预绘制的底板，选中的牌带高亮外框
+            rim = (255, 255, 100) if i == selected else None
+            blit(card_frame(120, 100, rim), (x - 2, hand_y - 2))
             
-            pygame.draw.rect(screen, COLOR_CARD_BG, card_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, card_rect, 2, border_radius=8)
-            
-            name_surf = self.font_tiny.render(card.name[:10], True, COLOR_TEXT)
-            cost_surf = self.font_small.render(str(card.cost), True, COLOR_MANA_BAR)
-            screen.blit(name_surf, (x + 5, hand_y + 5))
-            screen.blit(cost_surf, (x + 5, hand_y + 25))
-        
-        # 绘制战斗日志
-        log_y = 250
-        for log in self.battle_log[-5:]:
-            log_surf = self.font_tiny.render(log, True, COLOR_TEXT_DIM)
-            screen.blit(log_surf, (SCREEN_WIDTH - 450, log_y))
-            log_y += 20
+            name_surf, cost_surf = get_card_text(card)
+            append((name_surf, (x + 5, hand_y + 5)))
+            append((cost_surf, (x + 5, hand_y + 25)))
+        
+        # 绘制战斗日志（已在添加日志时合成为一张表面）
+        if self._log_surface is not None:
+            append((self._log_surface, self.LOG_POSITIONS[0]))
+        blit_batch(screen, blits)
         
         # 绘制回合信息
         turn_text = f"回合 {self.turn_number} - {current_player.name}"
-        turn_surf = self.font.render(turn_text, True, COLOR_TEXT)
+        turn_surf = render_text(self.font, turn_text, COLOR_TEXT)
         screen.blit(turn_surf, (SCREEN_WIDTH//2 - turn_surf.get_width()//2, 20))
         
         # 按钮
         self.back_button.draw(screen)
         self.end_turn_button.draw(screen)
         
-        # 打出卡牌按钮
-        play_button_rect = pygame.Rect(SCREEN_WIDTH - 440, SCREEN_HEIGHT - 60, 200, 40)
-        pygame.draw.rect(screen, COLOR_BUTTON, play_button_rect, border_radius=8)
-        pygame.draw.rect(screen, COLOR_CARD_BORDER, play_button_rect, 2, border_radius=8)
-        play_text = self.font_small.render("打出卡牌", True, COLOR_TEXT)
-        screen.blit(play_text, (play_button_rect.centerx - play_text.get_width()//2,
-                                play_button_rect.centery - play_text.get_height()//2))
+        # 只刷新内容变化的条带
+        band_keys = (
+            (turn_text, self._area_key(opponent, False)),
+            self._log_tail,
+            (self._area_key(current_player, True), tuple(card.id for card in current_player.hand),
+             self.selected_hand_index, self.back_button.hovered, self.end_turn_button.hovered),
+        )
+        if self._band_keys is not None:
+            self.update_rects = [rect for rect, old, new in zip(self.UPDATE_BANDS, self._band_keys, band_keys)
+                                 if old != new]
+        self._band_keys = band_keys
+    
+    def _area_key(self, player: PlayerBattleState, is_current: bool) -> Tuple:
+        """玩家区域显示内容的快照，用于判断该区域是否需要刷新"""
+        return (player.name, player.base_hp, player.base_mana, len(player.deck),
+                tuple((cs.character.id, cs.cur_hp, cs.cur_energy) for cs in player.chars),
+                self.selected_actor_index if is_current else self.selected_target)
+    
+    def _get_card_text(self, card: Card) -> Tuple[pygame.Surface, pygame.Surface]:
+        """获取手牌的名称和费用文字"""
+        surfs = self._card_text.get(card.id)
+        if surfs is None:
+            surfs = (display_format(self.font_tiny.render(card.display_name, True, COLOR_TEXT)),
+                     display_format(self.font_small.render(str(card.cost), True, COLOR_MANA_BAR)))
+            self._card_text[card.id] = surfs
+        return surfs
+    
+    def _get_char_name(self, character: Character) -> pygame.Surface:
+        """获取角色名文字"""
+        surf = self._char_names.get(character.id)
+        if surf is None:
+            surf = display_format(self.font_small.render(character.name, True, COLOR_TEXT))
+            self._char_names[character.id] = surf
+        return surf
+    
+    def _make_area_rects(self, x: int, y: int) -> Dict:
+        """预先创建玩家区域内的矩形：基地框及其高亮框、基地血条、两个前场角色框，
+        以及两个前场槽位的 (高亮框, HP条, MP条)"""
+        base_rect = pygame.Rect(SCREEN_WIDTH - 250, y, 200, 120)
+        char_rects = [pygame.Rect(x + i * 200, y, 180, 120) for i in range(2)]
+        return {
+            "base": base_rect,
+            "base_halo": base_rect.inflate(4, 4),
+            "base_hp": pygame.Rect(SCREEN_WIDTH - 240, y + 65, 0, 15),
+            "chars": char_rects,
+            "slots": [(char_rect.inflate(4, 4),
+                       pygame.Rect(char_rect.x + 10, y + 40, 0, 15),
+                       pygame.Rect(char_rect.x + 10, y + 60, 0, 15)) for char_rect in char_rects],
+        }
     
     def draw_player_area(self, screen: pygame.Surface, player: PlayerBattleState, 
                         x: int, y: int, is_current: bool):
         """绘制玩家区域"""
-        # 玩家信息
-        name_surf = self.font.render(player.name, True, COLOR_TEXT)
-        screen.blit(name_surf, (x, y - 30))
+        rects = self._area_rects[(x, y)]
+        # 文字收集起来，在血条等矩形画完后一次批量 blit
+        blits = []
         
-        # 基地信息框
-        base_rect = pygame.Rect(SCREEN_WIDTH - 250, y, 200, 120)
+        # 玩家信息
+        blits.append((render_text(self.font, player.name, COLOR_TEXT), (x, y - 30)))
         
-        # 高亮选中的基地
+        # 高亮选中的基地（基地框本身在静态背景层中）
         if not is_current and self.selected_target == "b":
-            pygame.draw.rect(screen, (255, 100, 100), base_rect.inflate(4, 4), border_radius=8)
-        
-        pygame.draw.rect(screen, COLOR_CARD_BG, base_rect, border_radius=8)
-        pygame.draw.rect(screen, COLOR_CARD_BORDER, base_rect, 2, border_radius=8)
-        
-        # 基地标题
-        base_title = self.font_small.render("基地", True, COLOR_TEXT)
-        screen.blit(base_title, (SCREEN_WIDTH - 240, y + 10))
+            pygame.draw.rect(screen, (255, 100, 100), rects["base_halo"], 2, border_radius=8)
         
         # 基地生命值
         hp_text = f"HP: {player.base_hp}/100"
-        hp_surf = self.font_small.render(hp_text, True, COLOR_HP_BAR)
-        screen.blit(hp_surf, (SCREEN_WIDTH - 240, y + 40))
+        blits.append((render_text(self.font_small, hp_text, COLOR_HP_BAR), (SCREEN_WIDTH - 240, y + 40)))
         
-        # HP条
-        hp_ratio = max(0, player.base_hp / 100)
-        hp_bar_rect = pygame.Rect(SCREEN_WIDTH - 240, y + 65, 180, 15)
-        pygame.draw.rect(screen, (50, 50, 50), hp_bar_rect)
-        hp_fill_rect = pygame.Rect(SCREEN_WIDTH - 240, y + 65, int(180 * hp_ratio), 15)
-        pygame.draw.rect(screen, COLOR_HP_BAR, hp_fill_rect)
+        # HP条（整数运算求填充宽度，宽度为 0 时不绘制）
+        hp_fill_rect = rects["base_hp"]
+        hp_fill_rect.width = 180 * max(0, player.base_hp) // 100
+        if hp_fill_rect.width:
+            pygame.draw.rect(screen, COLOR_HP_BAR, hp_fill_rect)
         
         # 基地魔力
         mp_text = f"魔力: {player.base_mana}/30"
-        mp_surf = self.font_small.render(mp_text, True, COLOR_MANA_BAR)
-        screen.blit(mp_surf, (SCREEN_WIDTH - 240, y + 90))
+        blits.append((render_text(self.font_small, mp_text, COLOR_MANA_BAR), (SCREEN_WIDTH - 240, y + 90)))
         
         # 牌库信息
         deck_info = f"牌库: {len(player.deck)}张"
-        deck_surf = self.font_tiny.render(deck_info, True, COLOR_TEXT_DIM)
-        screen.blit(deck_surf, (SCREEN_WIDTH - 240, y + 110))
+        blits.append((render_text(self.font_tiny, deck_info, COLOR_TEXT_DIM), (SCREEN_WIDTH - 240, y + 110)))
         
         # 绘制前场角色
         for i in range(min(2, len(player.chars))):
             char_state = player.chars[i]
             char_x = x + i * 200
-            char_rect = pygame.Rect(char_x, y, 180, 120)
+            halo_rect, hp_fill_rect, mp_fill_rect = rects["slots"][i]
             
-            # 高亮选中的角色
+            # 高亮选中的角色（角色框本身在静态背景层中）
             if is_current and i == self.selected_actor_index:
-                pygame.draw.rect(screen, (100, 255, 100), char_rect.inflate(4, 4), border_radius=8)
-            elif not is_current and self.selected_target == f"t{i}":
-                pygame.draw.rect(screen, (255, 100, 100), char_rect.inflate(4, 4), border_radius=8)
-            
-            pygame.draw.rect(screen, COLOR_CARD_BG, char_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, char_rect, 2, border_radius=8)
+                pygame.draw.rect(screen, (100, 255, 100), halo_rect, 2, border_radius=8)
+            elif not is_current and self.selected_target == self.TARGET_SLOTS[i]:
+                pygame.draw.rect(screen, (255, 100, 100), halo_rect, 2, border_radius=8)
             
             # 角色名
-            name = self.font_small.render(char_state.character.name, True, COLOR_TEXT)
-            screen.blit(name, (char_x + 10, y + 10))
+            blits.append((self._get_char_name(char_state.character), (char_x + 10, y + 10)))
             
             # HP条
-            hp_ratio = max(0, char_state.cur_hp / char_state.character.health)
-            hp_bar_rect = pygame.Rect(char_x + 10, y + 40, 160, 15)
-            pygame.draw.rect(screen, (50, 50, 50), hp_bar_rect)
-            hp_fill_rect = pygame.Rect(char_x + 10, y + 40, int(160 * hp_ratio), 15)
-            pygame.draw.rect(screen, COLOR_HP_BAR, hp_fill_rect)
-            hp_text = self.font_tiny.render(f"{char_state.cur_hp}/{char_state.character.health}", 
-                                           True, COLOR_TEXT)
-            screen.blit(hp_text, (char_x + 15, y + 42))
+            hp_fill_rect.width = 160 * max(0, char_state.cur_hp) // char_state.max_hp
+            if hp_fill_rect.width:
+                pygame.draw.rect(screen, COLOR_HP_BAR, hp_fill_rect)
+            hp_text = render_text(self.font_tiny, f"{char_state.cur_hp}/{char_state.max_hp}",
+                                  COLOR_TEXT)
+            blits.append((hp_text, (char_x + 15, y + 42)))
             
             # MP条
-            mp_ratio = max(0, char_state.cur_energy / char_state.character.energy)
-            mp_bar_rect = pygame.Rect(char_x + 10, y + 60, 160, 15)
-            pygame.draw.rect(screen, (30, 30, 30), mp_bar_rect)
-            mp_fill_rect = pygame.Rect(char_x + 10, y + 60, int(160 * mp_ratio), 15)
-            pygame.draw.rect(screen, COLOR_ENERGY_BAR, mp_fill_rect)
-            mp_text = self.font_tiny.render(f"{char_state.cur_energy}/{char_state.character.energy}",
-                                           True, COLOR_TEXT)
-            screen.blit(mp_text, (char_x + 15, y + 62))
+            mp_fill_rect.width = 160 * max(0, char_state.cur_energy) // char_state.max_energy
+            if mp_fill_rect.width:
+                pygame.draw.rect(screen, COLOR_ENERGY_BAR, mp_fill_rect)
+            mp_text = render_text(self.font_tiny, f"{char_state.cur_energy}/{char_state.max_energy}",
+                                  COLOR_TEXT)
+            blits.append((mp_text, (char_x + 15, y + 62)))
         
         # 显示后场角色
         if len(player.chars) == 3:
             reserve = player.chars[2]
             res_text = f"后场: {reserve.character.name} ({reserve.cur_hp}HP)"
-            res_surf = self.font_tiny.render(res_text, True, COLOR_TEXT_DIM)
-            screen.blit(res_surf, (x, y + 130))
+            blits.append((render_text(self.font_tiny, res_text, COLOR_TEXT_DIM), (x, y + 130)))
+        
+        blit_batch(screen, blits)
 
 class NetworkLobbyScene(Scene):
     """网络大厅场景"""
+    # 每帧处理的消息上限，避免消息突发时卡住渲染
+    MESSAGES_PER_FRAME = 16
+    # 接收线程一次唤醒最多切出的消息数，数据持续涌入时也会定期入队并通知主线程
+    RECV_BATCH_MAX = 64
+    # 参数输入框的标签；输入框位置按模式预先算好，绘制和点击检测共用
+    INPUT_LABELS = {"host": "主机地址:", "port": "端口:", "name": "玩家名称:"}
+    INPUT_LAYOUTS = {
+        mode: {key: pygame.Rect(SCREEN_WIDTH//2 - 150, 250 + i * 60, 300, 40)
+               for i, key in enumerate(keys)}
+        for mode, keys in (("client", ("host", "port", "name")), ("host", ("port", "name")))
+    }
+    # 对战日志每行的位置（条数即日志队列长度）
+    LOG_POSITIONS = tuple((100, 200 + i * 25) for i in range(10))
+    
     def __init__(self, game):
         super().__init__(game)
         self.font_title = get_chinese_font(32)
@@ -1502,15 +2066,30 @@ class NetworkLobbyScene(Scene):
         self.conn_socket = None
         self.recv_thread = None
         self.net_running = False
-        self.message_queue = queue.Queue()
+        # 唤醒接收线程用的本地 socket 对：disconnect 写入 _wake_w，接收线程随即退出
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        # 接收线程 append、主线程 popleft（deque 两端操作线程安全），有新消息时置位 _msg_event
+        # 队列中是未解码的消息字节，由 handle_message 按需解码
+        self.message_queue: deque = deque()
+        self._msg_event = threading.Event()
         self.send_lock = threading.Lock()
+        self._send_pending: deque = deque()  # 待发送的完整帧，由 _flush_send 合并发送
         
         # 战斗相关
         self.local_player: Optional[PlayerBattleState] = None
         self.remote_player: Optional[PlayerBattleState] = None
-        self.battle_log = []
+        self.battle_log = deque(maxlen=len(self.LOG_POSITIONS))
         self.my_turn = False
         
+        # 消息类型（ASCII 字节串）-> 处理函数，参数为 ';' 之后解码得到的文本
+        self._handlers: Dict[bytes, Callable[[str], None]] = {
+            b"NAME": self._on_name,
+            b"EMOJI": self._on_emoji,
+            b"PLAY": self._on_play,
+            b"ENDTURN": self._on_end_turn,
+        }
+        
         self.back_button = Button(20, 20, 100, 40, "返回",
                                   callback=self.disconnect)
         self.host_button = Button(SCREEN_WIDTH//2 - 250, 300, 200, 60, "创建房间",
@@ -1560,7 +2139,11 @@ class NetworkLobbyScene(Scene):
                 self.add_log("已连接！")
                 self.my_turn = False  # 客户端后手
             
+            # 消息都很短，关闭 Nagle 算法，避免出牌/结束回合被延迟合并发送
+            self.conn_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
             # 启动接收线程
+            self._wake_r, self._wake_w = socket.socketpair()
             self.net_running = True
             self.recv_thread = threading.Thread(target=self._recv_thread, daemon=True)
             self.recv_thread.start()
@@ -1572,57 +2155,121 @@ class NetworkLobbyScene(Scene):
             import time
             timeout = time.time() + 5
             while time.time() < timeout:
-                try:
-                    msg = self.message_queue.get(timeout=0.1)
-                    if msg.startswith("NAME;"):
-                        self.opponent_name = msg.split(';', 1)[1]
-                        break
-                except queue.Empty:
+                self._msg_event.clear()
+                if not self.message_queue:
+                    self._msg_event.wait(0.1)
                     continue
+                head, _, name = self.message_queue.popleft().partition(b';')
+                if head == b"NAME":
+                    self.opponent_name = name.decode('utf-8', errors='replace')
+                    break
             
+            # 与名称一起到达的后续消息交给主循环处理
+            if self.message_queue:
+                self._msg_event.set()
             self.stage = 3
             self.add_log(f"已连接: {self.opponent_name}")
             
         except Exception as e:
-            self.add_log(f"连接失败: {e}")
             self.stage = 1
+            self.add_log(f"连接失败: {e}")
     
     def _recv_thread(self):
         """接收线程"""
-        buffer = ""
-        while self.net_running:
-            try:
-                data = self.conn_socket.recv(4096).decode('utf-8')
-                if not data:
-                    break
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    if line:
-                        self.message_queue.put(line)
-            except:
-                break
+        # 固定大小的接收缓冲区（恰好容纳一条最长消息）：recv_into 直接写到 wpos 之后，
+        # 从头按长度前缀逐条切出完整消息（不解码），每次接收后只搬移一次剩余数据
+        header_size = NET_HEADER.size
+        rxbuf = bytearray(header_size + NET_MAX_MESSAGE)
+        view = memoryview(rxbuf)
+        wpos = 0
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(self.conn_socket, selectors.EVENT_READ)
+            selector.register(self._wake_r, selectors.EVENT_READ)
+            running = True
+            while running and self.net_running:
+                # 阻塞等待数据或唤醒信号，无需轮询超时
+                ready = selector.select()
+                
+                # 一次唤醒内持续读取已到达的数据（零超时 select 确认仍可读），
+                # 直到暂无数据或攒够 RECV_BATCH_MAX 条消息，再统一入队并只通知一次
+                batch = []
+                while ready and len(batch) < self.RECV_BATCH_MAX:
+                    if any(key.fileobj is self._wake_r for key, _ in ready):
+                        running = False
+                        break
+                    n = self.conn_socket.recv_into(view[wpos:])
+                    if not n:
+                        running = False
+                        break
+                    wpos += n
+                    
+                    rpos = 0
+                    while wpos - rpos >= header_size:
+                        (length,) = NET_HEADER.unpack_from(rxbuf, rpos)
+                        if length > NET_MAX_MESSAGE:
+                            raise ValueError(f"消息过长: {length}")
+                        end = rpos + header_size + length
+                        if end > wpos:
+                            break
+                        batch.append(bytes(view[rpos + header_size:end]))
+                        rpos = end
+                    
+                    if rpos:
+                        # 未收完的半条消息移到缓冲区开头
+                        rxbuf[:wpos - rpos] = rxbuf[rpos:wpos]
+                        wpos -= rpos
+                    ready = selector.select(0)
+                
+                if batch:
+                    self.message_queue.extend(batch)
+                    self._msg_event.set()
+        except (OSError, ValueError):
+            pass
+        finally:
+            selector.close()
+            self._wake_r.close()
         self.net_running = False
     
     def _send_message(self, msg: str):
         """发送消息"""
         if self.conn_socket:
-            with self.send_lock:
-                try:
-                    self.conn_socket.send((msg + '\n').encode('utf-8'))
-                except:
-                    pass
+            data = msg.encode('utf-8')
+            # 整帧作为一项入队，避免与其他线程的消息交错
+            self._send_pending.append(NET_HEADER.pack(len(data)) + data)
+            self._flush_send()
+    
+    def _flush_send(self):
+        """把当前所有待发送的数据拼成一次 sendall（多个线程同时发送时合并为一次系统调用）
+        
+        不等待 send_lock：若其他线程正在发送，本线程的消息已入队，
+        由持锁线程释放锁后再次检查队列时一并发出
+        """
+        pending = self._send_pending
+        while pending and self.send_lock.acquire(blocking=False):
+            try:
+                chunks = [pending.popleft() for _ in range(len(pending))]
+                self.conn_socket.sendall(b''.join(chunks))
+            except OSError:
+                pass
+            finally:
+                self.send_lock.release()
     
     def add_log(self, msg: str):
-        """添加日志"""
+        """添加日志（连接线程也会调用，需要重绘）"""
         self.battle_log.append(msg)
-        if len(self.battle_log) > 10:
-            self.battle_log.pop(0)
+        self.mark_dirty()
         print(msg)
     
     def disconnect(self):
         """断开连接"""
         self.net_running = False
+        if self._wake_w:
+            try:
+                self._wake_w.send(b'x')
+            except OSError:
+                pass  # 接收线程已退出
+            self._wake_w.close()
         if self.conn_socket:
             try:
                 self.conn_socket.close()
@@ -1645,28 +2292,34 @@ class NetworkLobbyScene(Scene):
         self.add_log("已结束回合")
     
     def process_messages(self):
-        """处理接收到的消息"""
-        while not self.message_queue.empty():
-            try:
-                msg = self.message_queue.get_nowait()
-                self.handle_message(msg)
-            except queue.Empty:
-                break
-    
-    def handle_message(self, msg: str):
-        """处理消息"""
-        if msg.startswith("NAME;"):
-            self.opponent_name = msg.split(';', 1)[1]
-        elif msg.startswith("EMOJI;"):
-            emoji = msg.split(';', 1)[1]
-            self.add_log(f"[对方表情] {emoji}")
-        elif msg.startswith("PLAY;"):
-            parts = msg.split(';')
-            if len(parts) >= 4:
-                self.add_log(f"对方出了一张牌")
-        elif msg == "ENDTURN":
-            self.my_turn = True
-            self.add_log("对方结束回合，轮到你了")
+        """处理接收到的消息（每帧最多处理 MESSAGES_PER_FRAME 条，其余留到下一帧）"""
+        pending = self.message_queue
+        count = min(len(pending), self.MESSAGES_PER_FRAME)
+        for _ in range(count):
+            self.handle_message(pending.popleft())
+        if count:
+            self.mark_dirty()
+    
+    def handle_message(self, msg: bytes):
+        """处理消息（按 ASCII 类型头分发，只解码参数部分）"""
+        head, _, args = msg.partition(b';')
+        handler = self._handlers.get(head)
+        if handler:
+            handler(args.decode('utf-8', errors='replace') if args else "")
+    
+    def _on_name(self, name: str):
+        self.opponent_name = name
+    
+    def _on_emoji(self, emoji: str):
+        self.add_log(f"[对方表情] {emoji}")
+    
+    def _on_play(self, args: str):
+        if args.count(';') >= 2:
+            self.add_log(f"对方出了一张牌")
+    
+    def _on_end_turn(self, args: str):
+        self.my_turn = True
+        self.add_log("对方结束回合，轮到你了")
     
     def handle_event(self, event: pygame.event.Event):
         self.back_button.handle_event(event)
@@ -1680,21 +2333,10 @@ class NetworkLobbyScene(Scene):
                 mouse_pos = event.pos
                 
                 # 检查输入框点击
-                if self.mode == "client":
-                    host_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 250, 300, 40)
-                    if host_rect.collidepoint(mouse_pos):
-                        self.input_focus = "host"
+                for key, rect in self.INPUT_LAYOUTS[self.mode].items():
+                    if rect.collidepoint(mouse_pos):
+                        self.input_focus = key
                         return
-                
-                port_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 310, 300, 40)
-                if port_rect.collidepoint(mouse_pos):
-                    self.input_focus = "port"
-                    return
-                
-                name_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, 370, 300, 40)
-                if name_rect.collidepoint(mouse_pos):
-                    self.input_focus = "name"
-                    return
             
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_BACKSPACE:
@@ -1706,7 +2348,7 @@ class NetworkLobbyScene(Scene):
                         self.player_name = self.player_name[:-1]
                 elif event.key == pygame.K_RETURN:
                     self.start_connection()
-                elif event.unicode.isprintable():
+                elif is_printable_input(event.unicode):
                     if self.input_focus == "host":
                         self.host_address += event.unicode
                     elif self.input_focus == "port":
@@ -1730,97 +2372,76 @@ class NetworkLobbyScene(Scene):
                         self.end_turn()
     
     def update(self, dt: float):
-        if self.stage == 3:
+        # 只在接收线程放入新消息后处理；本帧没处理完的留待下一帧
+        if self.stage == 3 and self._msg_event.is_set():
+            self._msg_event.clear()
             self.process_messages()
+            if self.message_queue:
+                self._msg_event.set()
     
     def draw(self, screen: pygame.Surface):
         screen.fill(COLOR_BG)
         
         if self.stage == 0:  # 选择模式
-            title = self.font_title.render("局域网联机", True, COLOR_TEXT)
+            title = render_text(self.font_title, "局域网联机", COLOR_TEXT)
             screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
             
             self.host_button.draw(screen)
             self.client_button.draw(screen)
             
-            hint = self.font_small.render("创建房间将等待其他玩家加入", True, COLOR_TEXT_DIM)
+            hint = render_text(self.font_small, "创建房间将等待其他玩家加入", COLOR_TEXT_DIM)
             screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 400))
         
         elif self.stage == 1:  # 输入参数
             title_text = "创建房间" if self.mode == "host" else "加入房间"
-            title = self.font_title.render(title_text, True, COLOR_TEXT)
+            title = render_text(self.font_title, title_text, COLOR_TEXT)
             screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 150))
             
-            # 主机地址输入（仅客户端）
-            y = 250
-            if self.mode == "client":
-                label = self.font.render("主机地址:", True, COLOR_TEXT)
-                screen.blit(label, (SCREEN_WIDTH//2 - 250, y))
+            # 主机地址（仅客户端）、端口、玩家名称输入框
+            # 文字在输入框画完后一次批量 blit
+            values = {"host": self.host_address, "port": self.port, "name": self.player_name}
+            blits = []
+            for key, rect in self.INPUT_LAYOUTS[self.mode].items():
+                label = render_text(self.font, self.INPUT_LABELS[key], COLOR_TEXT)
+                blits.append((label, (SCREEN_WIDTH//2 - 250, rect.y)))
                 
-                host_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, y, 300, 40)
-                color = COLOR_BUTTON_HOVER if self.input_focus == "host" else COLOR_BUTTON
-                pygame.draw.rect(screen, color, host_rect, border_radius=8)
-                pygame.draw.rect(screen, COLOR_CARD_BORDER, host_rect, 2, border_radius=8)
+                color = COLOR_BUTTON_HOVER if self.input_focus == key else COLOR_BUTTON
+                pygame.draw.rect(screen, color, rect, border_radius=8)
+                pygame.draw.rect(screen, COLOR_CARD_BORDER, rect, 2, border_radius=8)
                 
-                host_surf = self.font_small.render(self.host_address, True, COLOR_TEXT)
-                screen.blit(host_surf, (host_rect.x + 10, host_rect.y + 10))
-                y += 60
-            
-            # 端口输入
-            label = self.font.render("端口:", True, COLOR_TEXT)
-            screen.blit(label, (SCREEN_WIDTH//2 - 250, y))
-            
-            port_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, y, 300, 40)
-            color = COLOR_BUTTON_HOVER if self.input_focus == "port" else COLOR_BUTTON
-            pygame.draw.rect(screen, color, port_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, port_rect, 2, border_radius=8)
-            
-            port_surf = self.font_small.render(self.port, True, COLOR_TEXT)
-            screen.blit(port_surf, (port_rect.x + 10, port_rect.y + 10))
-            y += 60
-            
-            # 玩家名称输入
-            label = self.font.render("玩家名称:", True, COLOR_TEXT)
-            screen.blit(label, (SCREEN_WIDTH//2 - 250, y))
-            
-            name_rect = pygame.Rect(SCREEN_WIDTH//2 - 150, y, 300, 40)
-            color = COLOR_BUTTON_HOVER if self.input_focus == "name" else COLOR_BUTTON
-            pygame.draw.rect(screen, color, name_rect, border_radius=8)
-            pygame.draw.rect(screen, COLOR_CARD_BORDER, name_rect, 2, border_radius=8)
-            
-            name_surf = self.font_small.render(self.player_name, True, COLOR_TEXT)
-            screen.blit(name_surf, (name_rect.x + 10, name_rect.y + 10))
+                value_surf = render_text(self.font_small, values[key], COLOR_TEXT)
+                blits.append((value_surf, (rect.x + 10, rect.y + 10)))
+            blit_batch(screen, blits)
             
             self.connect_button.draw(screen)
         
         elif self.stage == 2:  # 连接中
-            title = self.font_title.render("连接中...", True, COLOR_TEXT)
+            title = render_text(self.font_title, "连接中...", COLOR_TEXT)
             screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 300))
         
         elif self.stage == 3:  # 已连接
-            # 显示对战信息
-            title = self.font_title.render(f"对战: {self.player_name} vs {self.opponent_name}", 
-                                          True, COLOR_TEXT)
-            screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))
+            # 显示对战信息（本阶段只有文字，收集后一次批量 blit）
+            title = render_text(self.font_title, f"对战: {self.player_name} vs {self.opponent_name}",
+                                COLOR_TEXT)
+            blits = [(title, (SCREEN_WIDTH//2 - title.get_width()//2, 50))]
             
             # 显示回合状态
             turn_text = "你的回合" if self.my_turn else "对方回合"
             turn_color = (100, 255, 100) if self.my_turn else (255, 100, 100)
-            turn_surf = self.font.render(turn_text, True, turn_color)
-            screen.blit(turn_surf, (SCREEN_WIDTH//2 - turn_surf.get_width()//2, 120))
+            turn_surf = render_text(self.font, turn_text, turn_color)
+            blits.append((turn_surf, (SCREEN_WIDTH//2 - turn_surf.get_width()//2, 120)))
             
-            # 显示日志
-            log_y = 200
-            for log in self.battle_log[-10:]:
-                log_surf = self.font_small.render(log, True, COLOR_TEXT_DIM)
-                screen.blit(log_surf, (100, log_y))
-                log_y += 25
+            # 显示日志（重复的回合/表情消息只渲染一次）
+            font_small = self.font_small
+            blits.extend(zip([render_text(font_small, log, COLOR_TEXT_DIM) for log in self.battle_log],
+                             self.LOG_POSITIONS))
             
             # 显示操作提示
             if self.my_turn:
-                hint = self.font_small.render("按空格键结束回合 | 1-3键发送表情", 
-                                             True, COLOR_TEXT_DIM)
-                screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, SCREEN_HEIGHT - 100))
+                hint = render_text(self.font_small, "按空格键结束回合 | 1-3键发送表情",
+                                   COLOR_TEXT_DIM)
+                blits.append((hint, (SCREEN_WIDTH//2 - hint.get_width()//2, SCREEN_HEIGHT - 100)))
+            blit_batch(screen, blits)
         
         self.back_button.draw(screen)
 
@@ -1835,6 +2456,14 @@ class DeckDetailScene(Scene):
         
         self.deck = game.decks[game.selected_deck_index] if 0 <= game.selected_deck_index < len(game.decks) else None
         
+        # 元素分布与卡牌数量统计（查看期间牌组不变，只统计一次）
+        cards = self.deck.cards if self.deck else []
+        self._elem_dist = Counter(chain.from_iterable(card.elements for card in cards))
+        self._card_counts = Counter(card.id for card in cards)
+        self._unique_cards = list({card.id: card for card in cards}.values())
+        self._card_elem_str = {card.id: ' '.join(map(element_to_string, card.elements))
+                               for card in self._unique_cards}
+        
         self.back_button = Button(20, 20, 100, 40, "返回",
                                   callback=lambda: game.change_scene(GameState.DECK_LIST))
     
@@ -1849,7 +2478,7 @@ class DeckDetailScene(Scene):
         screen.fill(COLOR_BG)
         
         if not self.deck:
-            text = self.font.render("未找到牌组", True, COLOR_TEXT)
+            text = render_text(self.font, "未找到牌组", COLOR_TEXT)
             screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 300))
             self.back_button.draw(screen)
             return
@@ -1857,51 +2486,48 @@ class DeckDetailScene(Scene):
         y = 80 - self.scroll_offset
         
         # 标题
-        title = self.font_title.render(f"牌组详情: {self.deck.name}", True, COLOR_TEXT)
+        title = render_text(self.font_title, f"牌组详情: {self.deck.name}", COLOR_TEXT)
         screen.blit(title, (100, y))
         y += 50
         
         # 基本信息
         type_text = "标准牌组" if self.deck.deck_type == DeckType.STANDARD else "休闲牌组"
-        info1 = self.font.render(f"类型: {type_text}", True, COLOR_TEXT)
+        info1 = render_text(self.font, f"类型: {type_text}", COLOR_TEXT)
         screen.blit(info1, (100, y))
         y += 35
         
-        info2 = self.font.render(f"卡牌数量: {len(self.deck.cards)}/20", True, COLOR_TEXT)
+        info2 = render_text(self.font, f"卡牌数量: {len(self.deck.cards)}/20", COLOR_TEXT)
         screen.blit(info2, (100, y))
         y += 35
         
-        info3 = self.font.render(f"角色数量: {len(self.deck.characters)}/3", True, COLOR_TEXT)
+        info3 = render_text(self.font, f"角色数量: {len(self.deck.characters)}/3", COLOR_TEXT)
         screen.blit(info3, (100, y))
         y += 45
         
         # 元素分布
-        elem_dist = defaultdict(int)
-        for card in self.deck.cards:
-            for elem in card.elements:
-                elem_dist[elem] += 1
-        
+        elem_dist = self._elem_dist
         if elem_dist:
-            elem_title = self.font.render("元素分布:", True, COLOR_TEXT)
+            elem_title = render_text(self.font, "元素分布:", COLOR_TEXT)
             screen.blit(elem_title, (100, y))
             y += 30
             
             for elem, count in elem_dist.items():
-                elem_text = self.font_small.render(f"  {element_to_string(elem)}: {count} 张", True, COLOR_TEXT_DIM)
+                elem_text = render_text(self.font_small, f"  {element_to_string(elem)}: {count} 张", COLOR_TEXT_DIM)
                 screen.blit(elem_text, (120, y))
                 y += 25
         
         y += 15
         
         # 角色列表
-        char_title = self.font.render("角色列表:", True, COLOR_TEXT)
+        char_title = render_text(self.font, "角色列表:", COLOR_TEXT)
         screen.blit(char_title, (100, y))
         y += 30
         
         for char in self.deck.characters:
-            char_text = self.font_small.render(
-                f"  • {char.name} (HP:{char.health}, MP:{char.energy})", 
-                True, COLOR_TEXT_DIM
+            char_text = render_text(
+                self.font_small,
+                f"  • {char.name} (HP:{char.health}, MP:{char.energy})",
+                COLOR_TEXT_DIM
             )
             screen.blit(char_text, (120, y))
             y += 25
@@ -1909,27 +2535,21 @@ class DeckDetailScene(Scene):
         y += 15
         
         # 卡牌列表（统计数量）
-        card_title = self.font.render("卡牌列表:", True, COLOR_TEXT)
+        card_title = render_text(self.font, "卡牌列表:", COLOR_TEXT)
         screen.blit(card_title, (100, y))
         y += 30
         
-        card_counts = defaultdict(int)
-        for card in self.deck.cards:
-            card_counts[card.id] += 1
-        
         # 按卡牌分组显示
-        seen_cards = set()
-        for card in self.deck.cards:
-            if card.id not in seen_cards:
-                seen_cards.add(card.id)
-                count = card_counts[card.id]
-                elements_str = ' '.join(element_to_string(e) for e in card.elements)
-                card_text = self.font_small.render(
-                    f"  • {card.name} x{count} (费用:{card.cost}, 元素:{elements_str})",
-                    True, COLOR_TEXT_DIM
-                )
-                screen.blit(card_text, (120, y))
-                y += 25
+        for card in self._unique_cards:
+            count = self._card_counts[card.id]
+            elements_str = self._card_elem_str[card.id]
+            card_text = render_text(
+                self.font_small,
+                f"  • {card.name} x{count} (费用:{card.cost}, 元素:{elements_str})",
+                COLOR_TEXT_DIM
+            )
+            screen.blit(card_text, (120, y))
+            y += 25
         
         self.back_button.draw(screen)
 
@@ -1944,6 +2564,11 @@ class DeckExportScene(Scene):
         self.deck = game.decks[game.selected_deck_index] if 0 <= game.selected_deck_index < len(game.decks) else None
         self.deck_code = self.deck.deck_code if self.deck else ""
         
+        # 代码按每行 60 个字符分行，导出期间不变，只渲染一次
+        chunk_size = 60
+        self._code_surfs = [display_format(self.font_small.render(self.deck_code[i:i+chunk_size], True, COLOR_TEXT))
+                            for i in range(0, len(self.deck_code), chunk_size)]
+        
         self.back_button = Button(20, 20, 100, 40, "返回",
                                   callback=lambda: game.change_scene(GameState.DECK_LIST))
         self.copy_button = Button(SCREEN_WIDTH//2 - 100, 450, 200, 50, "复制到剪贴板",
@@ -1967,17 +2592,17 @@ class DeckExportScene(Scene):
         screen.fill(COLOR_BG)
         
         if not self.deck:
-            text = self.font.render("未找到牌组", True, COLOR_TEXT)
+            text = render_text(self.font, "未找到牌组", COLOR_TEXT)
             screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 300))
             self.back_button.draw(screen)
             return
         
         # 标题
-        title = self.font_title.render(f"导出牌组: {self.deck.name}", True, COLOR_TEXT)
+        title = render_text(self.font_title, f"导出牌组: {self.deck.name}", COLOR_TEXT)
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 100))
         
         # 说明
-        hint = self.font_small.render("请保存以下代码，可用于导入牌组", True, COLOR_TEXT_DIM)
+        hint = render_text(self.font_small, "请保存以下代码，可用于导入牌组", COLOR_TEXT_DIM)
         screen.blit(hint, (SCREEN_WIDTH//2 - hint.get_width()//2, 180))
         
         # 显示代码（换行显示）
@@ -1986,11 +2611,8 @@ class DeckExportScene(Scene):
         pygame.draw.rect(screen, COLOR_CARD_BORDER, code_rect, 2, border_radius=8)
         
         # 分行显示代码
-        chunk_size = 60
         y = 250
-        for i in range(0, len(self.deck_code), chunk_size):
-            chunk = self.deck_code[i:i+chunk_size]
-            code_surf = self.font_small.render(chunk, True, COLOR_TEXT)
+        for code_surf in self._code_surfs:
             screen.blit(code_surf, (110, y))
             y += 22
         
@@ -2092,7 +2714,7 @@ class DeckImportScene(Scene):
                     self.deck_name = self.deck_name[:-1]
             elif event.key == pygame.K_RETURN:
                 self.do_import()
-            elif event.unicode.isprintable():
+            elif is_printable_input(event.unicode):
                 if self.input_focus == "code":
                     self.deck_code += event.unicode
                 elif self.input_focus == "name":
@@ -2106,11 +2728,11 @@ class DeckImportScene(Scene):
         screen.fill(COLOR_BG)
         
         # 标题
-        title = self.font_title.render("导入牌组", True, COLOR_TEXT)
+        title = render_text(self.font_title, "导入牌组", COLOR_TEXT)
         screen.blit(title, (SCREEN_WIDTH//2 - title.get_width()//2, 80))
         
         # 代码输入
-        code_label = self.font.render("牌组代码:", True, COLOR_TEXT)
+        code_label = render_text(self.font, "牌组代码:", COLOR_TEXT)
         screen.blit(code_label, (SCREEN_WIDTH//2 - 300, 180))
         
         code_rect = pygame.Rect(SCREEN_WIDTH//2 - 300, 220, 600, 120)
@@ -2123,12 +2745,12 @@ class DeckImportScene(Scene):
         y = 230
         for i in range(0, len(self.deck_code), chunk_size):
             chunk = self.deck_code[i:i+chunk_size]
-            code_surf = self.font_small.render(chunk, True, COLOR_TEXT)
+            code_surf = render_text(self.font_small, chunk, COLOR_TEXT)
             screen.blit(code_surf, (SCREEN_WIDTH//2 - 290, y))
             y += 22
         
         # 名称输入
-        name_label = self.font.render("牌组名称:", True, COLOR_TEXT)
+        name_label = render_text(self.font, "牌组名称:", COLOR_TEXT)
         screen.blit(name_label, (SCREEN_WIDTH//2 - 200, 350))
         
         name_rect = pygame.Rect(SCREEN_WIDTH//2 - 200, 380, 400, 50)
@@ -2136,13 +2758,13 @@ class DeckImportScene(Scene):
         pygame.draw.rect(screen, color, name_rect, border_radius=8)
         pygame.draw.rect(screen, COLOR_CARD_BORDER, name_rect, 2, border_radius=8)
         
-        name_surf = self.font.render(self.deck_name, True, COLOR_TEXT)
+        name_surf = render_text(self.font, self.deck_name, COLOR_TEXT)
         screen.blit(name_surf, (name_rect.x + 10, name_rect.y + 12))
         
         # 错误/成功消息
         if self.error_message:
             msg_color = (100, 255, 100) if self.import_success else (255, 100, 100)
-            msg_surf = self.font_small.render(self.error_message, True, msg_color)
+            msg_surf = render_text(self.font_small, self.error_message, msg_color)
             screen.blit(msg_surf, (SCREEN_WIDTH//2 - msg_surf.get_width()//2, 460))
         
         self.back_button.draw(screen)
@@ -2152,12 +2774,30 @@ class DeckImportScene(Scene):
 
 class Game:
     """主游戏类"""
+    # 游戏状态 -> 场景类
+    SCENE_MAP = {
+        GameState.MAIN_MENU: MainMenuScene,
+        GameState.CARD_VIEWER: CardViewerScene,
+        GameState.CHARACTER_VIEWER: CharacterViewerScene,
+        GameState.DECK_LIST: DeckListScene,
+        GameState.DECK_BUILDER: DeckBuilderScene,
+        GameState.BATTLE: BattleScene,
+        GameState.NETWORK_LOBBY: NetworkLobbyScene,
+        GameState.DECK_DETAIL: DeckDetailScene,
+        GameState.DECK_EXPORT: DeckExportScene,
+        GameState.DECK_IMPORT: DeckImportScene,
+    }
+    
     def __init__(self):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("魔法伤痕 - MagicWound")
         self.clock = pygame.time.Clock()
         self.running = True
         
+        # 启动时预先加载各场景用到的字号，切换场景时不再解析字体文件
+        for size in FONT_SIZES:
+            get_chinese_font(size)
+        
         # 数据库
         self.card_db = CardDatabase()
         self.character_db = CharacterDatabase()
@@ -2172,20 +2812,7 @@ class Game:
     
     def change_scene(self, state: GameState):
         """切换场景"""
-        scene_map = {
-            GameState.MAIN_MENU: MainMenuScene,
-            GameState.CARD_VIEWER: CardViewerScene,
-            GameState.CHARACTER_VIEWER: CharacterViewerScene,
-            GameState.DECK_LIST: DeckListScene,
-            GameState.DECK_BUILDER: DeckBuilderScene,
-            GameState.BATTLE: BattleScene,
-            GameState.NETWORK_LOBBY: NetworkLobbyScene,
-            GameState.DECK_DETAIL: DeckDetailScene,
-            GameState.DECK_EXPORT: DeckExportScene,
-            GameState.DECK_IMPORT: DeckImportScene,
-        }
-        
-        scene_class = scene_map.get(state)
+        scene_class = self.SCENE_MAP.get(state)
         if scene_class:
             self.current_scene = scene_class(self)
     
@@ -2198,29 +2825,52 @@ class Game:
         while self.running:
             dt = self.clock.tick(FPS) / 1000.0
             
-            # 事件处理
-            for event in pygame.event.get():
+            # 事件处理：同一帧内只保留最后一次鼠标移动，之前的移动事件已过时
+            events = pygame.event.get()
+            last_motion = -1
+            exposed = False
+            for i, event in enumerate(events):
+                if event.type == pygame.MOUSEMOTION:
+                    last_motion = i
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    exposed = True
+            
+            for i, event in enumerate(events):
+                if event.type == pygame.MOUSEMOTION and i != last_motion:
+                    continue
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
-                        if isinstance(self.current_scene, MainMenuScene):
+                        if self.current_scene.is_main_menu:
                             self.running = False
                         else:
                             self.change_scene(GameState.MAIN_MENU)
                 
                 if self.current_scene:
                     self.current_scene.handle_event(event)
+                    # 输入（含窗口事件）都可能改变画面
+                    self.current_scene.mark_dirty()
             
             # 更新
             if self.current_scene:
                 self.current_scene.update(dt)
             
-            # 渲染
-            if self.current_scene:
-                self.current_scene.draw(self.screen)
-            
-            pygame.display.flip()
+            # 渲染：画面没有变化时跳过绘制和刷新
+            # （先清除标记再绘制，绘制期间后台线程的改动会在下一帧重绘）
+            scene = self.current_scene
+            if scene and scene.dirty:
+                scene.dirty = False
+                scene.update_rects = None
+                scene.draw(self.screen)
+                # 场景只重绘了局部时只刷新这些区域；窗口被遮挡后重新显示、
+                # 或变化区域超过半屏时（逐块刷新不再划算）整屏刷新
+                rects = scene.update_rects
+                if (rects is None or exposed
+                        or sum(rect.width * rect.height for rect in rects) > SCREEN_AREA // 2):
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
         
         pygame.quit()
         sys.exit()